@@ -1,32 +1,48 @@
-from flask import Flask, request, jsonify, render_template, send_file, redirect, url_for, session
+from flask import Flask, request, jsonify, render_template, send_file, redirect, url_for, session, g, has_request_context
 from flask_talisman import Talisman
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
-import icalendar
+from datetime import datetime, timedelta, timezone
 import os
 import io
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 from functools import wraps
 from dotenv import load_dotenv
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from zoneinfo import ZoneInfo
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, update, event
 import uuid
 from flask import send_file, make_response
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from flask.logging import default_handler
+import queue
+import atexit
+import random
 import sys
 import hashlib
-from flask import Response
+from flask import Response, stream_with_context
+from werkzeug.http import is_resource_modified
 import time
 from sqlalchemy.sql import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 import re
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import hmac
+import gzip
+from collections import OrderedDict, namedtuple
+import json
+import bisect
+import sqlite3
+import threading
+import heapq
+import itertools
+import math
+import mmap
+import struct
+import tempfile
+import click
 from dateutil.parser import isoparse
 
 load_dotenv()  # This line loads the variables from .env
@@ -67,28 +83,38 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def send_confirmation_email(student_name, slot_start, slot_end, location):
-    """Send confirmation email for supervision signup"""
-    sender = 'jbr46@cam.ac.uk'
-    recipient = 'jbr46@cam.ac.uk'
-    msg = MIMEMultipart()
-    msg['From'] = sender
-    msg['To'] = recipient
-    msg['Subject'] = f'New supervision signup: {student_name}'
+CONFIRMATION_EMAIL_SENDER = 'jbr46@cam.ac.uk'
+CONFIRMATION_EMAIL_RECIPIENT = 'jbr46@cam.ac.uk'
+# Owner of the calendar that existed before multi-supervisor support.
+DEFAULT_CALENDAR_OWNER = 'jbr46'
+
+def send_confirmation_email(student_name, slot_start, slot_end, location, recipient=None):
+    """
+    Queue a confirmation email for a supervision signup.
+
+    recipient is the calendar owner's address; CONFIRMATION_EMAIL_RECIPIENT
+    is used when they have none.
+
+    The message is added to the current session, so it is committed (or
+    rolled back) together with the booking. The outbox worker delivers it.
+    """
     body = f"""New supervision signup received:
 Students: {student_name}
 Time: {slot_start.strftime('%A, %d %B %Y %I:%M %p')} - {slot_end.strftime('%I:%M %p')}
 Location: {location}
 """
-    msg.attach(MIMEText(body, 'plain'))
-    try:
-        with smtplib.SMTP('smtp.cam.ac.uk', 25) as server:
-            server.send_message(msg)
-            app.logger.info(f"Email sent to {recipient} for new signup")
-            return True
-    except Exception as e:
-        app.logger.error(f"Error sending email: {str(e)}")
-        return False
+    db.session.add(
+        EmailOutbox(
+            sender=CONFIRMATION_EMAIL_SENDER,
+            recipient=recipient or CONFIRMATION_EMAIL_RECIPIENT,
+            subject=f'New supervision signup: {student_name}',
+            body=body,
+            status='pending',
+            attempts=0,
+            next_attempt_at=_utcnow(),
+            created_at=_utcnow(),
+        )
+    )
 
 def _parse_local_datetime(value, field_name: str) -> datetime:
     if value is None:
@@ -169,6 +195,18 @@ def _normalize_optional_slot_name(value):
         raise ValueError("Name contains invalid characters")
     return normalized
 
+def _parse_range_param(value, field_name: str):
+    """Parse an optional window bound (date or datetime) from a query string."""
+    if value is None or not value.strip():
+        return None
+    try:
+        dt = isoparse(value.strip())
+    except Exception as e:
+        raise ValueError(f"Parameter '{field_name}' must be an ISO date or datetime") from e
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(london_tz).replace(tzinfo=None)
+    return dt
+
 def _parse_end_of_term(value: str) -> datetime:
     if not value:
         raise ValueError("END_OF_TERM must be configured to use repeat signup")
@@ -180,6 +218,10 @@ def _parse_end_of_term(value: str) -> datetime:
         dt = dt.astimezone(london_tz).replace(tzinfo=None)
     return dt
 
+def _term_start():
+    """Start of the current term from TERM_START, or None if unset."""
+    return _parse_range_param(os.getenv('TERM_START'), 'TERM_START')
+
 def _repeated_occurrences(slot_start: datetime, slot_duration: timedelta, end_of_term: datetime):
     current_date = slot_start + timedelta(weeks=1)
     while current_date.date() <= end_of_term.date():
@@ -192,6 +234,36 @@ def _repeated_occurrences(slot_start: datetime, slot_duration: timedelta, end_of
         yield repeated_start, repeated_start + slot_duration
         current_date += timedelta(weeks=1)
 
+def _find_occurrence_conflicts(occurrences, calendar_id):
+    """
+    Return the calendar's booked slots overlapping any of the (start, end) occurrences.
+
+    Runs one range scan over the whole span of the series (served by the
+    start/end index) and matches candidates against the sorted, non-overlapping
+    occurrences in memory, rather than OR-ing one predicate per week.
+    """
+    span_start = occurrences[0][0]
+    span_end = occurrences[-1][1]
+    candidates = (
+        TimeSlot.query.filter(
+            TimeSlot.calendar_id == calendar_id,
+            TimeSlot.is_available == False,
+            TimeSlot.start_time < span_end,
+            TimeSlot.end_time > span_start,
+        )
+        .order_by(TimeSlot.start_time)
+        .all()
+    )
+    occurrence_starts = [start for start, _ in occurrences]
+    conflicts = []
+    for candidate in candidates:
+        # Last occurrence starting before the candidate ends is the only one
+        # that can overlap it (occurrences are weekly and shorter than a week).
+        index = bisect.bisect_left(occurrence_starts, candidate.end_time) - 1
+        if index >= 0 and occurrences[index][1] > candidate.start_time:
+            conflicts.append(candidate)
+    return conflicts
+
 app = Flask(__name__)
 Talisman(app, content_security_policy=None)
 @app.before_request
@@ -211,6 +283,80 @@ if database_url and database_url.startswith("postgres://"):
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///timeslots.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+_SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+_SQLITE_SYNCHRONOUS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _metrics.observe(
+                'scheduler_db_pool_checkout_wait_seconds',
+                {'endpoint': _metrics_endpoint()},
+                time.perf_counter() - started,
+            )
+
+def _engine_profile(database_uri: str):
+    """
+    Build SQLAlchemy engine options from the environment.
+
+    Returns (engine_options, profile), where profile is the summary reported
+    by /api/health. SQLite settings are applied as PRAGMAs on each new
+    connection (see _apply_sqlite_pragmas).
+    """
+    dialect = database_uri.split(':', 1)[0].split('+', 1)[0]
+    if dialect == 'sqlite':
+        journal_mode = os.getenv('SQLITE_JOURNAL_MODE', 'WAL').upper()
+        synchronous = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+        if journal_mode not in _SQLITE_JOURNAL_MODES:
+            raise RuntimeError(f"SQLITE_JOURNAL_MODE must be one of {sorted(_SQLITE_JOURNAL_MODES)}")
+        if synchronous not in _SQLITE_SYNCHRONOUS:
+            raise RuntimeError(f"SQLITE_SYNCHRONOUS must be one of {sorted(_SQLITE_SYNCHRONOUS)}")
+        profile = {
+            'dialect': 'sqlite',
+            'journal_mode': journal_mode,
+            'synchronous': synchronous,
+            'busy_timeout_ms': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+            'cache_size_kib': int(os.getenv('SQLITE_CACHE_SIZE_KIB', '16384')),
+            'mmap_size_mb': int(os.getenv('SQLITE_MMAP_SIZE_MB', '256')),
+        }
+        return {'poolclass': _TimedQueuePool}, profile
+
+    profile = {
+        'dialect': dialect,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    options = {key: value for key, value in profile.items() if key != 'dialect'}
+    options['poolclass'] = _TimedQueuePool
+    if dialect == 'postgresql':
+        profile['statement_timeout_ms'] = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '15000'))
+        options['connect_args'] = {'options': f"-c statement_timeout={profile['statement_timeout_ms']}"}
+    return options, profile
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'], _db_profile = _engine_profile(app.config['SQLALCHEMY_DATABASE_URI'])
+
+@event.listens_for(Engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection) or _db_profile['dialect'] != 'sqlite':
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={_db_profile['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous={_db_profile['synchronous']}")
+        cursor.execute(f"PRAGMA busy_timeout={_db_profile['busy_timeout_ms']}")
+        cursor.execute(f"PRAGMA cache_size=-{_db_profile['cache_size_kib']}")
+        cursor.execute(f"PRAGMA mmap_size={_db_profile['mmap_size_mb'] * 1024 * 1024}")
+    finally:
+        cursor.close()
+
 db = SQLAlchemy(app)
 
 class TimeSlot(db.Model):
@@ -221,20 +367,251 @@ class TimeSlot(db.Model):
     name = db.Column(db.String(100))
     location = db.Column(db.String(200))
     is_repeated = db.Column(db.Boolean, default=False)
+    # Shared by all occurrences created by one repeating signup.
+    series_id = db.Column(db.String(36))
+    # Owning supervisor's Admin.calendar_id.
+    calendar_id = db.Column(db.String(36))
+    # For pieces book_supervision cut out of an available slot: the id of the
+    # slot the admin created. Only pieces of one slot are ever compacted.
+    split_from = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_time_slot_calendar_start', 'calendar_id', 'start_time'),
+        db.Index('ix_time_slot_start_end', 'start_time', 'end_time'),
+        db.Index('ix_time_slot_is_available', 'is_available'),
+        db.Index('ix_time_slot_series_start', 'series_id', 'start_time'),
+    )
+
+class ArchivedTimeSlot(db.Model):
+    """Slots from past terms, moved out of time_slot by archive_slots().
+
+    slot_id is the id the slot had in time_slot. SQLite may hand that id to
+    a new slot, so the feed gives archived events their own UIDs
+    ('archived-<id>'). Only the opt-in export reads this table.
+    """
+    __tablename__ = 'time_slot_archive'
+    id = db.Column(db.Integer, primary_key=True)
+    slot_id = db.Column(db.Integer, nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    is_available = db.Column(db.Boolean)
+    name = db.Column(db.String(100))
+    location = db.Column(db.String(200))
+    is_repeated = db.Column(db.Boolean)
+    series_id = db.Column(db.String(36))
+    calendar_id = db.Column(db.String(36))
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_time_slot_archive_calendar_start', 'calendar_id', 'start_time'),
+    )
+
+class DataRevision(db.Model):
+    """Single-row counter bumped by every write to time_slot.
+
+    Workers compare it against the revision their in-process caches were
+    built from, so a write in one gunicorn worker invalidates the others.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+class SlotChange(db.Model):
+    """Append-only log of which slots changed at each data revision.
+
+    Upserts are resolved against time_slot when read, so a row only needs the
+    slot id; 'delete' rows are tombstones for slots that no longer exist.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.BigInteger, nullable=False, index=True)
+    slot_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    # What happened, for live clients: booked, freed, moved, relocated,
+    # created, updated, deleted or archived.
+    kind = db.Column(db.String(10))
+    # Indexed for the retention prune that runs on every write.
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class EmailOutbox(db.Model):
+    """Outgoing email, written in the same transaction as the change it reports.
+
+    status is 'pending' (waiting for next_attempt_at), 'sending' (claimed by a
+    sender), 'sent', or 'dead' (gave up after EMAIL_OUTBOX_MAX_ATTEMPTS).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(200), nullable=False)
+    recipient = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(300), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, nullable=False)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+class IdempotencyKey(db.Model):
+    """Response stored for a request sent with an Idempotency-Key header.
+
+    status is 'pending' while the first request with the key runs and
+    'done' once its response is stored. Rows expire after
+    IDEMPOTENCY_TTL_HOURS.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    endpoint = db.Column(db.String(100), nullable=False)
+    # Calendar the caller acts on, so two supervisors can't share a key.
+    scope = db.Column(db.String(64), nullable=False, default='')
+    key = db.Column(db.String(200), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('endpoint', 'scope', 'key', name='uq_idempotency_key_endpoint_scope_key'),
+        db.Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
 
 class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     calendar_id = db.Column(db.String(36), unique=True, nullable=False)
+    # Shown in the calendar feed; defaults to the username.
+    display_name = db.Column(db.String(100))
+    # Where signup confirmations for this calendar are sent.
+    email = db.Column(db.String(200))
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, display_name=None, email=None):
         self.username = username
         self.password_hash = generate_password_hash(password)
         self.calendar_id = str(uuid.uuid4())
+        self.display_name = display_name
+        self.email = email
+
+BOOKED_OVERLAP_CONSTRAINT = 'time_slot_booked_no_overlap'
+
+_SQLITE_BOOKED_OVERLAP_GUARD = [
+    # Replace the pre-tenancy guard, which compared slots across calendars.
+    "DROP INDEX IF EXISTS ix_time_slot_booked_start_end",
+    f"DROP TRIGGER IF EXISTS {BOOKED_OVERLAP_CONSTRAINT}_insert",
+    f"DROP TRIGGER IF EXISTS {BOOKED_OVERLAP_CONSTRAINT}_update",
+    # Partial index so the trigger's overlap probe only walks booked rows.
+    "CREATE INDEX IF NOT EXISTS ix_time_slot_booked_calendar_start_end "
+    "ON time_slot (calendar_id, start_time, end_time) WHERE is_available = 0",
+    f"""CREATE TRIGGER {BOOKED_OVERLAP_CONSTRAINT}_insert
+    BEFORE INSERT ON time_slot
+    WHEN NEW.is_available = 0
+    BEGIN
+        SELECT RAISE(ABORT, '{BOOKED_OVERLAP_CONSTRAINT}')
+        WHERE EXISTS (
+            SELECT 1 FROM time_slot
+            WHERE is_available = 0
+              AND calendar_id IS NEW.calendar_id
+              AND start_time < NEW.end_time
+              AND end_time > NEW.start_time
+        );
+    END""",
+    f"""CREATE TRIGGER {BOOKED_OVERLAP_CONSTRAINT}_update
+    BEFORE UPDATE OF start_time, end_time, is_available, calendar_id ON time_slot
+    WHEN NEW.is_available = 0
+    BEGIN
+        SELECT RAISE(ABORT, '{BOOKED_OVERLAP_CONSTRAINT}')
+        WHERE EXISTS (
+            SELECT 1 FROM time_slot
+            WHERE is_available = 0
+              AND id != NEW.id
+              AND calendar_id IS NEW.calendar_id
+              AND start_time < NEW.end_time
+              AND end_time > NEW.start_time
+        );
+    END""",
+]
+
+def _install_booked_overlap_guard(connection):
+    """
+    Make the database reject overlapping booked slots within a calendar.
+
+    Postgres gets a GiST exclusion constraint over the calendar and the
+    slot's time range (timestamps are naive London time, hence tsrange;
+    btree_gist provides = for calendar_id); SQLite gets equivalent BEFORE
+    INSERT/UPDATE triggers backed by a partial index. Safe to run repeatedly.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in _SQLITE_BOOKED_OVERLAP_GUARD:
+            connection.execute(text(statement))
+    elif dialect == 'postgresql':
+        definition = connection.execute(
+            text("SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conname = :name"),
+            {"name": BOOKED_OVERLAP_CONSTRAINT},
+        ).scalar()
+        if definition is not None and 'calendar_id' not in definition:
+            connection.execute(text(f"ALTER TABLE time_slot DROP CONSTRAINT {BOOKED_OVERLAP_CONSTRAINT}"))
+            definition = None
+        if definition is None:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            connection.execute(text(
+                f"ALTER TABLE time_slot ADD CONSTRAINT {BOOKED_OVERLAP_CONSTRAINT} "
+                "EXCLUDE USING gist (calendar_id WITH =, tsrange(start_time, end_time) WITH &&) "
+                "WHERE (NOT is_available)"
+            ))
+
+@event.listens_for(TimeSlot.__table__, 'after_create')
+def _time_slot_created(target, connection, **kw):
+    _install_booked_overlap_guard(connection)
+
+def _is_booked_overlap_error(error: IntegrityError) -> bool:
+    # SQLite trigger message, or Postgres exclusion_violation (SQLSTATE 23P01).
+    return (
+        BOOKED_OVERLAP_CONSTRAINT in str(error.orig)
+        or getattr(error.orig, 'pgcode', None) == '23P01'
+    )
+
+def _booked_overlap_response(
+    windows,
+    message='Requested time overlaps an existing booked slot',
+    exclude_ids=(),
+    calendar_id=None,
+):
+    """409 in the usual conflict shape, listing the calendar's booked slots overlapping any window."""
+    conflicts = {}
+    for window_start, window_end in windows:
+        for slot in TimeSlot.query.filter(
+            TimeSlot.calendar_id == calendar_id,
+            TimeSlot.is_available == False,
+            TimeSlot.start_time < window_end,
+            TimeSlot.end_time > window_start,
+            TimeSlot.id.notin_(exclude_ids),
+        ).order_by(TimeSlot.start_time):
+            conflicts[slot.id] = slot
+    return (
+        jsonify({
+            'success': False,
+            'message': message,
+            'conflicts': [
+                {
+                    'id': slot.id,
+                    'start_time': slot.start_time.isoformat(),
+                    'end_time': slot.end_time.isoformat(),
+                    'name': slot.name,
+                    'location': slot.location,
+                }
+                for slot in sorted(conflicts.values(), key=lambda s: s.start_time)
+            ],
+        }),
+        409,
+    )
 
 def ensure_admin_account():
-    admin = Admin.query.first()
+    admin = Admin.query.order_by(Admin.id).first()
     if admin:
         return admin
 
@@ -243,7 +620,12 @@ def ensure_admin_account():
         raise RuntimeError("ADMIN_PASSWORD must be set to initialize admin account")
 
     app.logger.warning("No admin user found, creating default admin")
-    admin = Admin(username='admin', password=admin_password)
+    admin = Admin(
+        username='admin',
+        password=admin_password,
+        display_name=DEFAULT_CALENDAR_OWNER,
+        email=CONFIRMATION_EMAIL_RECIPIENT,
+    )
     db.session.add(admin)
     try:
         db.session.commit()
@@ -255,13 +637,958 @@ def ensure_admin_account():
             return admin
         raise
 
+CalendarInfo = namedtuple('CalendarInfo', 'calendar_id username display_name email')
+
+# Calendar owners by calendar_id ('' for the default calendar), as
+# {key: (expires_at, CalendarInfo)}. Per worker; admins change rarely, so
+# entries just expire. Unknown ids are not cached, so new calendars work at once.
+_calendar_cache = {}
+_CALENDAR_CACHE_SECONDS = 60
+
+def _calendar_info(calendar_id=None):
+    """Return the CalendarInfo for calendar_id (the default calendar if None), or None."""
+    key = calendar_id or ''
+    cached = _calendar_cache.get(key)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    if calendar_id:
+        admin = Admin.query.filter_by(calendar_id=calendar_id).first()
+    else:
+        # The first admin owns the default calendar served at / and by
+        # requests that don't name one.
+        admin = Admin.query.order_by(Admin.id).first()
+    if admin is None:
+        return None
+    info = CalendarInfo(admin.calendar_id, admin.username, admin.display_name or admin.username, admin.email)
+    _calendar_cache[key] = (now + _CALENDAR_CACHE_SECONDS, info)
+    return info
+
+@event.listens_for(Admin.__table__, 'after_create')
+@event.listens_for(Admin.__table__, 'after_drop')
+def _admin_table_reset(target, connection, **kw):
+    _calendar_cache.clear()
+
+class CalendarNotFound(Exception):
+    pass
+
+@app.errorhandler(CalendarNotFound)
+def _calendar_not_found(error):
+    return jsonify({'success': False, 'message': 'Calendar not found'}), 404
+
+def _requested_calendar_id():
+    """
+    Calendar named by the `calendar` query parameter, else the default one.
+
+    Raises CalendarNotFound for an unknown id. Returns None only when no admin
+    exists yet, which matches slots that have no owner.
+    """
+    calendar_id = request.args.get('calendar')
+    if calendar_id:
+        if _calendar_info(calendar_id) is None:
+            raise CalendarNotFound(calendar_id)
+        return calendar_id
+    info = _calendar_info()
+    return info.calendar_id if info else None
+
+def _admin_calendar_id():
+    """Calendar an authenticated admin request acts on."""
+    if session.get('admin_logged_in'):
+        if session.get('admin_calendar_id'):
+            return session['admin_calendar_id']
+        # Sessions from before per-admin calendars belong to the default admin.
+        info = _calendar_info()
+        return info.calendar_id if info else None
+    # The API token is deployment-wide and may name any calendar.
+    return _requested_calendar_id()
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _ensure_data_revision_row():
+    if db.session.get(DataRevision, 1) is None:
+        db.session.add(DataRevision(id=1, revision=0, updated_at=_utcnow()))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
+def _bump_data_revision() -> int:
+    """Bump the data revision inside the caller's (uncommitted) transaction."""
+    now = _utcnow()
+    result = db.session.execute(
+        text(
+            "UPDATE data_revision SET revision = revision + 1, updated_at = :now "
+            "WHERE id = 1"
+        ),
+        {"now": now},
+    )
+    if result.rowcount != 1:
+        db.session.execute(
+            text(
+                "INSERT INTO data_revision (id, revision, updated_at) "
+                "VALUES (1, 1, :now)"
+            ),
+            {"now": now},
+        )
+    return db.session.execute(
+        text("SELECT revision FROM data_revision WHERE id = 1")
+    ).scalar_one()
+
+def _record_slot_changes(upserted=(), deleted=(), kinds=None) -> int:
+    """
+    Bump the data revision and log the changed slot ids under it.
+
+    kinds optionally maps slot ids to what happened to them (see
+    SlotChange.kind); upserts default to 'updated' and deletes to 'deleted'.
+    Must be called in the same transaction as the slot writes, after a flush
+    if any new slots need their ids.
+    """
+    kinds = kinds or {}
+    revision = _bump_data_revision()
+    now = _utcnow()
+    rows = [
+        {
+            "revision": revision,
+            "slot_id": slot_id,
+            "op": "upsert",
+            "kind": kinds.get(slot_id, "updated"),
+            "created_at": now,
+        }
+        for slot_id in dict.fromkeys(upserted)
+    ] + [
+        {
+            "revision": revision,
+            "slot_id": slot_id,
+            "op": "delete",
+            "kind": kinds.get(slot_id, "deleted"),
+            "created_at": now,
+        }
+        for slot_id in dict.fromkeys(deleted)
+    ]
+    if rows:
+        db.session.execute(insert(SlotChange), rows)
+
+    retention_days = int(os.getenv('SLOT_CHANGE_RETENTION_DAYS', '7'))
+    db.session.execute(
+        db.delete(SlotChange).where(SlotChange.created_at < now - timedelta(days=retention_days))
+    )
+    return revision
+
+def _current_data_revision():
+    """Return (revision, updated_at) without touching time_slot."""
+    row = db.session.execute(
+        db.select(DataRevision.revision, DataRevision.updated_at).where(DataRevision.id == 1)
+    ).first()
+    if row is None:
+        return 0, None
+    return row.revision, row.updated_at
+
+# icalendar, smtplib and email.mime are imported where they are used: most
+# workers never send mail or render a feed, and importing them slows boot.
+
+def _outbox_smtp_connection():
+    import smtplib
+
+    return smtplib.SMTP(
+        os.getenv('SMTP_HOST', 'smtp.cam.ac.uk'),
+        int(os.getenv('SMTP_PORT', '25')),
+        timeout=30,
+    )
+
+def _outbox_retry_delay(attempts: int) -> timedelta:
+    base = int(os.getenv('EMAIL_OUTBOX_RETRY_SECONDS', '60'))
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+def _outbox_mime_message(message):
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = message.sender
+    msg['To'] = message.recipient
+    msg['Subject'] = message.subject
+    msg.attach(MIMEText(message.body, 'plain'))
+    return msg
+
+def deliver_outbox_batch(smtp_factory=None, batch_size=None) -> dict:
+    """
+    Claim up to batch_size due messages and send them over one SMTP connection.
+
+    Failed messages are retried with exponential backoff and marked 'dead'
+    after EMAIL_OUTBOX_MAX_ATTEMPTS. Returns counts of claimed/sent/retried/dead.
+    """
+    import smtplib
+
+    smtp_factory = smtp_factory or _outbox_smtp_connection
+    batch_size = batch_size or int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+    max_attempts = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+    counts = {'claimed': 0, 'sent': 0, 'retried': 0, 'dead': 0}
+    now = _utcnow()
+
+    # Release messages left claimed by a sender that died mid-batch.
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.status == 'sending', EmailOutbox.claimed_at < now - timedelta(minutes=10))
+        .values(status='pending')
+    )
+    candidate_ids = db.session.execute(
+        db.select(EmailOutbox.id)
+        .where(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.id)
+        .limit(batch_size)
+    ).scalars().all()
+    claimed_ids = []
+    for message_id in candidate_ids:
+        # Conditional claim so concurrent senders never send the same row twice.
+        result = db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id, EmailOutbox.status == 'pending')
+            .values(status='sending', claimed_at=now)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(message_id)
+    db.session.commit()
+    counts['claimed'] = len(claimed_ids)
+    if not claimed_ids:
+        return counts
+
+    messages = EmailOutbox.query.filter(EmailOutbox.id.in_(claimed_ids)).order_by(EmailOutbox.id).all()
+    server = None
+    connect_failed = False
+    try:
+        for message in messages:
+            message.attempts += 1
+            try:
+                if connect_failed:
+                    raise smtplib.SMTPConnectError(421, 'SMTP relay unavailable')
+                if server is None:
+                    try:
+                        server = smtp_factory()
+                    except Exception:
+                        # Don't hammer a down relay once per message.
+                        connect_failed = True
+                        raise
+                send_started = time.perf_counter()
+                try:
+                    server.send_message(_outbox_mime_message(message))
+                finally:
+                    _metrics.observe(
+                        'scheduler_email_send_duration_seconds', {},
+                        time.perf_counter() - send_started,
+                    )
+            except Exception as e:
+                # Anything else (a bad address, a bug building the message)
+                # still counts as a failed attempt rather than leaving the row
+                # in 'sending' until the stale-claim release.
+                unexpected = not isinstance(e, (smtplib.SMTPException, OSError))
+                if server is not None:
+                    try:
+                        server.close()
+                    except Exception:
+                        pass
+                    server = None
+                message.last_error = str(e)[:500]
+                if message.attempts >= max_attempts:
+                    message.status = 'dead'
+                    counts['dead'] += 1
+                    app.logger.error(
+                        "Giving up on email %s after %s attempts: %s", message.id, message.attempts, e,
+                        exc_info=unexpected,
+                    )
+                else:
+                    message.status = 'pending'
+                    message.next_attempt_at = _utcnow() + _outbox_retry_delay(message.attempts)
+                    counts['retried'] += 1
+                    app.logger.warning("Error sending email %s, will retry: %s", message.id, e, exc_info=unexpected)
+            else:
+                message.status = 'sent'
+                message.sent_at = _utcnow()
+                message.last_error = None
+                counts['sent'] += 1
+                app.logger.info("Email sent to %s for new signup", message.recipient)
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        db.session.commit()
+    return counts
+
+def drain_outbox(smtp_factory=None) -> dict:
+    """Deliver batches until no due messages remain; returns summed counts."""
+    batch_size = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+    totals = {'claimed': 0, 'sent': 0, 'retried': 0, 'dead': 0}
+    while True:
+        counts = deliver_outbox_batch(smtp_factory=smtp_factory, batch_size=batch_size)
+        for key, value in counts.items():
+            totals[key] += value
+        if counts['claimed'] < batch_size:
+            return totals
+
+_outbox_wakeup = threading.Event()
+_outbox_thread = None
+_outbox_thread_lock = threading.Lock()
+
+def _outbox_worker_enabled() -> bool:
+    # Set EMAIL_OUTBOX_WORKER=off when running `flask drain-outbox --loop` as its own process.
+    return not app.config.get('TESTING') and os.getenv('EMAIL_OUTBOX_WORKER', 'thread') == 'thread'
+
+def _outbox_worker_loop():
+    poll_seconds = float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '30'))
+    while True:
+        _outbox_wakeup.wait(poll_seconds)
+        _outbox_wakeup.clear()
+        try:
+            with app.app_context():
+                drain_outbox()
+        except Exception:
+            app.logger.exception("Email outbox worker failed")
+
+def _start_outbox_worker():
+    global _outbox_thread
+    with _outbox_thread_lock:
+        if _outbox_thread is not None and _outbox_thread.is_alive():
+            return
+        # Started lazily so each gunicorn worker gets its own thread after fork.
+        _outbox_thread = threading.Thread(target=_outbox_worker_loop, name='email-outbox', daemon=True)
+        _outbox_thread.start()
+
+@app.before_request
+def _ensure_outbox_worker():
+    if _outbox_thread is None and _outbox_worker_enabled():
+        _start_outbox_worker()
+
+def _notify_outbox_worker():
+    if _outbox_worker_enabled():
+        _start_outbox_worker()
+        _outbox_wakeup.set()
+
+@app.cli.command('drain-outbox')
+@click.option('--loop', is_flag=True, help='Keep polling for new messages.')
+def drain_outbox_command(loop):
+    """Send pending confirmation emails."""
+    poll_seconds = float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '30'))
+    while True:
+        counts = drain_outbox()
+        click.echo(
+            f"sent={counts['sent']} retried={counts['retried']} dead={counts['dead']}"
+        )
+        if not loop:
+            return
+        time.sleep(poll_seconds)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Metrics:
+    """
+    Minimal Prometheus-style counters and histograms for one process.
+
+    With METRICS_DIR set, each worker also writes its snapshot there (at most
+    every few seconds) and /api/metrics sums every worker's file, so a scrape
+    sees the whole gunicorn pool rather than whichever worker answered.
+    """
+
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, labels, value=1.0):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name, labels, value):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(_LATENCY_BUCKETS), 0.0, 0]
+            for index, bound in enumerate(_LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        metrics_dir = os.getenv('METRICS_DIR')
+        now = time.monotonic()
+        if not metrics_dir or now - self.last_flush < self.FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        path = os.path.join(metrics_dir, f"{os.getpid()}.json")
+        try:
+            os.makedirs(metrics_dir, exist_ok=True)
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            app.logger.warning("Could not write metrics snapshot: %s", e)
+
+    def collect(self) -> list:
+        """Snapshots from this process plus any other workers in METRICS_DIR."""
+        snapshots = [self.snapshot()]
+        metrics_dir = os.getenv('METRICS_DIR')
+        if metrics_dir and os.path.isdir(metrics_dir):
+            own_file = f"{os.getpid()}.json"
+            for filename in os.listdir(metrics_dir):
+                if not filename.endswith('.json') or filename == own_file:
+                    continue
+                try:
+                    with open(os.path.join(metrics_dir, filename)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return snapshots
+
+def _render_prometheus(snapshots) -> str:
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [[0] * len(_LATENCY_BUCKETS), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+
+    def label_text(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (
+            key + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+            for key, value in pairs
+        )
+        return '{' + ','.join(escaped) + '}'
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{label_text(labels)} {value:g}")
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(_LATENCY_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{label_text(labels, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{name}_bucket{label_text(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{label_text(labels)} {total:g}")
+            lines.append(f"{name}_count{label_text(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+_metrics = _Metrics()
+
+def _metrics_endpoint() -> str:
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    labels = {'endpoint': _metrics_endpoint()}
+    _metrics.inc('scheduler_sql_statements_total', labels)
+    _metrics.inc('scheduler_sql_duration_seconds_total', labels, elapsed)
+
+@event.listens_for(Engine, 'handle_error')
+def _sql_failed(exception_context):
+    # after_cursor_execute does not run for a failed statement.
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    labels = {'endpoint': request.endpoint or 'unmatched', 'method': request.method}
+    started = g.get('request_started')
+    if started is not None:
+        _metrics.observe('scheduler_request_duration_seconds', labels, time.perf_counter() - started)
+    _metrics.inc('scheduler_requests_total', {**labels, 'status': str(response.status_code)})
+    _metrics.maybe_flush()
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+@admin_required
+def metrics():
+    """Prometheus text exposition of request, SQL, pool and email metrics."""
+    return Response(
+        _render_prometheus(_metrics.collect()),
+        mimetype='text/plain',
+        headers={'Cache-Control': 'no-store'},
+    )
+
+# Admission control for the signup rush. Each endpoint class has a token
+# bucket per client and a global one, kept in a small file mapped into every
+# worker so the limits hold across the gunicorn pool. Signups also pass a
+# bounded per-worker queue that admits clients round-robin.
+_ADMISSION_CLIENT_BUCKETS = 4096
+_ADMISSION_BUCKET = struct.Struct('dd')  # tokens, monotonic time of last update
+_ADMISSION_CLASSES = {
+    'get_timeslots': 'reads',
+    'get_timeslot_changes': 'reads',
+    'signup': 'signups',
+}
+_ADMISSION_DEFAULTS = {
+    'ADMISSION_CLIENT_READS': '2/s:20',
+    'ADMISSION_GLOBAL_READS': '200/s:400',
+    'ADMISSION_CLIENT_SIGNUPS': '10/m:5',
+    'ADMISSION_GLOBAL_SIGNUPS': '20/s:40',
+}
+
+def _parse_bucket(value: str, name: str):
+    """Parse 'RATE/UNIT:BURST' (e.g. '2/s:20', '10/m:5') into (tokens per second, burst)."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)/([smh]):(\d+)', value.strip())
+    if not match:
+        raise RuntimeError(f"{name} must look like '2/s:20' (rate per s, m or h, then burst)")
+    per = {'s': 1, 'm': 60, 'h': 3600}[match.group(2)]
+    return float(match.group(1)) / per, int(match.group(3))
+
+class _AdmissionBuckets:
+    """
+    Token buckets stored in a shared memory-mapped file.
+
+    Slots 0 and 1 are the global read and signup buckets; each client hashes
+    to one of _ADMISSION_CLIENT_BUCKETS read and signup slots after them (two
+    clients sharing a slot just share a budget). A zeroed slot is full. If
+    the file cannot be used the buckets live in this process only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = None
+        self._file = None
+        self._fcntl = None
+        self._limits = None
+
+    def _open(self):
+        size = _ADMISSION_BUCKET.size * (2 + 2 * _ADMISSION_CLIENT_BUCKETS)
+        path = os.getenv('ADMISSION_STATE_FILE') or os.path.join(
+            tempfile.gettempdir(),
+            'scheduler-admission-%s.bin' % hashlib.md5(app.config['SQLALCHEMY_DATABASE_URI'].encode()).hexdigest()[:12],
+        )
+        try:
+            import fcntl
+            self._file = open(path, 'a+b')
+            if os.fstat(self._file.fileno()).st_size < size:
+                self._file.truncate(size)
+            self._buffer = mmap.mmap(self._file.fileno(), size)
+            self._fcntl = fcntl
+        except (ImportError, OSError) as e:
+            app.logger.warning("Admission state file %s unavailable, limiting per worker: %s", path, e)
+            self._buffer = bytearray(size)
+        self._limits = {
+            name: _parse_bucket(os.getenv(name, default), name) for name, default in _ADMISSION_DEFAULTS.items()
+        }
+
+    def _refill(self, offset, rate, burst, now):
+        tokens, updated = _ADMISSION_BUCKET.unpack_from(self._buffer, offset)
+        if updated == 0 or updated > now:  # never used, or written before a reboot
+            return float(burst)
+        return min(float(burst), tokens + (now - updated) * rate)
+
+    def take(self, kind: str, client: str) -> float:
+        """Spend a token from both buckets; returns 0, or seconds until one is available."""
+        with self._lock:
+            if self._buffer is None:
+                self._open()
+            client_rate, client_burst = self._limits[f'ADMISSION_CLIENT_{kind.upper()}']
+            global_rate, global_burst = self._limits[f'ADMISSION_GLOBAL_{kind.upper()}']
+            index = 0 if kind == 'reads' else 1
+            bucket = int.from_bytes(hashlib.blake2b(client.encode(), digest_size=4).digest(), 'big')
+            client_index = 2 + index * _ADMISSION_CLIENT_BUCKETS + bucket % _ADMISSION_CLIENT_BUCKETS
+            offsets = (index * _ADMISSION_BUCKET.size, client_index * _ADMISSION_BUCKET.size)
+            if self._fcntl:
+                self._fcntl.flock(self._file, self._fcntl.LOCK_EX)
+            try:
+                now = time.monotonic()
+                levels = [
+                    self._refill(offsets[0], global_rate, global_burst, now),
+                    self._refill(offsets[1], client_rate, client_burst, now),
+                ]
+                wait = max(
+                    (1 - level) / rate if level < 1 else 0.0
+                    for level, rate in zip(levels, (global_rate, client_rate))
+                )
+                if wait == 0:
+                    levels = [level - 1 for level in levels]
+                for offset, level in zip(offsets, levels):
+                    _ADMISSION_BUCKET.pack_into(self._buffer, offset, level, now)
+                return wait
+            finally:
+                if self._fcntl:
+                    self._fcntl.flock(self._file, self._fcntl.LOCK_UN)
+
+class _FairQueue:
+    """
+    Let at most `limit` requests run at once and queue up to `max_waiting`.
+
+    Waiters are ordered by how many requests their client already has
+    waiting, then by arrival, so one client retrying in a loop cannot push
+    everyone else back.
+
+    One queue per worker process: it only has work to do under a threaded
+    worker class (the Procfile's gthread), never under sync workers.
+    """
+
+    def __init__(self, limit: int, max_waiting: int):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = []
+        self._per_client = {}
+        self._arrivals = itertools.count()
+
+    def acquire(self, client: str, timeout: float) -> bool:
+        with self._cond:
+            if self._active < self.limit and not self._waiting:
+                self._active += 1
+                return True
+            if len(self._waiting) >= self.max_waiting:
+                return False
+            entry = (self._per_client.get(client, 0), next(self._arrivals), client)
+            self._per_client[client] = entry[0] + 1
+            heapq.heappush(self._waiting, entry)
+            deadline = time.monotonic() + timeout
+            try:
+                while not (self._waiting[0] is entry and self._active < self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                heapq.heappop(self._waiting)
+                self._active += 1
+                return True
+            finally:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._per_client[client] -= 1
+                if not self._per_client[client]:
+                    del self._per_client[client]
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+_admission_buckets = _AdmissionBuckets()
+_signup_queue = _FairQueue(
+    int(os.getenv('SIGNUP_CONCURRENCY', '4')),
+    int(os.getenv('SIGNUP_QUEUE_MAX', '32')),
+)
+
+def _admission_enabled() -> bool:
+    return not app.config.get('TESTING') and os.getenv('ADMISSION_CONTROL', 'on') != 'off'
+
+def _admission_client() -> str:
+    """Client address, taking the nearest X-Forwarded-For hop from a trusted proxy."""
+    trusted = os.getenv('ADMISSION_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+    address = request.remote_addr or ''
+    forwarded = request.headers.get('X-Forwarded-For')
+    if forwarded and address in trusted:
+        address = forwarded.split(',')[-1].strip()
+    return address
+
+def _too_many_requests(retry_after: float):
+    response = jsonify({'success': False, 'message': 'The server is busy, please try again in a moment'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+@app.before_request
+def _admit_request():
+    kind = _ADMISSION_CLASSES.get(request.endpoint)
+    if kind is None or not _admission_enabled() or _is_admin_authenticated():
+        return None
+    client = _admission_client()
+    wait = _admission_buckets.take(kind, client)
+    if wait:
+        app.logger.info("Rejected %s from %s: rate limited for %.1fs", request.endpoint, client, wait)
+        return _too_many_requests(wait)
+    if kind == 'signups':
+        timeout = int(os.getenv('SIGNUP_QUEUE_TIMEOUT_MS', '2000')) / 1000
+        if not _signup_queue.acquire(client, timeout):
+            app.logger.warning("Rejected signup from %s: signup queue full", client)
+            return _too_many_requests(timeout)
+        g.signup_admitted = True
+    return None
+
+@app.teardown_request
+def _release_signup_slot(exc):
+    if g.pop('signup_admitted', False):
+        _signup_queue.release()
+
+# Static files are linked as /static/<file>?v=<content hash>. A request
+# carrying the current hash can be cached forever; anything else revalidates.
+_static_fingerprints = {}
+
+def _static_fingerprint(filename):
+    """Short content hash of a static file, recomputed when its mtime or size changes."""
+    path = safe_join(app.static_folder, filename)
+    try:
+        stat = os.stat(path) if path else None
+    except OSError:
+        stat = None
+    if stat is None:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _static_fingerprints.get(filename)
+    if cached is None or cached[0] != version:
+        with open(path, 'rb') as f:
+            cached = _static_fingerprints[filename] = (version, hashlib.sha256(f.read()).hexdigest()[:12])
+    return cached[1]
+
+@app.url_defaults
+def _fingerprint_static_urls(endpoint, values):
+    if endpoint == 'static' and 'v' not in values:
+        fingerprint = _static_fingerprint(values.get('filename', ''))
+        if fingerprint:
+            values['v'] = fingerprint
+
+@app.after_request
+def _static_cache_headers(response):
+    if request.endpoint == 'static' and response.status_code in (200, 304):
+        version = request.args.get('v')
+        if version and version == _static_fingerprint(request.view_args['filename']):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.template_global()
+def static_variant(filename, width, fmt):
+    """URL of static/variants/<stem>-<width>.<fmt> if the asset build made it, else None."""
+    variant = f"variants/{os.path.splitext(filename)[0]}-{width}.{fmt}"
+    if _static_fingerprint(variant) is None:
+        return None
+    return url_for('static', filename=variant)
+
+@app.template_global()
+def static_image(filename, width):
+    """Downscaled PNG of a static image when one was built, else the original."""
+    return static_variant(filename, width, 'png') or url_for('static', filename=filename)
+
+# Rendered pages as {(template, context): (etag, html, gzipped html)}, most
+# recently used last. These pages only depend on their context (env settings
+# and calendar name), so each worker renders and compresses them once.
+_page_cache = OrderedDict()
+_page_cache_lock = threading.Lock()
+_PAGE_CACHE_SIZE = 64
+
+def _cached_page(template, **context):
+    """Serve a render of `template` that depends only on `context`, gzip- and ETag-aware."""
+    key = (template, tuple(sorted(context.items())))
+    with _page_cache_lock:
+        cached = _page_cache.get(key)
+        if cached is not None:
+            _page_cache.move_to_end(key)
+    if cached is None or app.debug:
+        html = render_template(template, **context).encode()
+        cached = (hashlib.md5(html).hexdigest(), html, gzip.compress(html, compresslevel=9))
+        with _page_cache_lock:
+            _page_cache[key] = cached
+            _page_cache.move_to_end(key)
+            while len(_page_cache) > _PAGE_CACHE_SIZE:
+                _page_cache.popitem(last=False)
+    etag, plain, compressed = cached
+
+    use_gzip = request.accept_encodings['gzip'] > 0
+    representation_etag = f"{etag}-gz" if use_gzip else etag
+    if request.if_none_match.contains(representation_etag):
+        response = Response(status=304)
+    else:
+        response = Response(compressed if use_gzip else plain, mimetype='text/html')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(representation_etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def _render_signup_page(calendar, show_owner=True):
+    return _cached_page(
+        'index.html',
+        supervision_start_date=os.getenv('SUPERVISION_START_DATE'),
+        calendar_id=calendar.calendar_id if calendar else None,
+        calendar_name=calendar.display_name if calendar and show_owner else None,
+    )
+
 @app.route('/')
 def index():
     app.logger.info('Accessing index page')
-    supervision_start_date = os.getenv('SUPERVISION_START_DATE')
-    return render_template('index.html', supervision_start_date=supervision_start_date)
+    return _render_signup_page(_calendar_info(), show_owner=False)
+
+@app.route('/c/<calendar_id>')
+def calendar_page(calendar_id):
+    calendar = _calendar_info(calendar_id)
+    if calendar is None:
+        return "Calendar not found", 404
+    return _render_signup_page(calendar)
+
+def _replay_response(row):
+    response = Response(row.response_body, status=row.response_status, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def _idempotency_scope() -> str:
+    """Calendar an admin acts on, or the one a public request names."""
+    calendar_id = _admin_calendar_id() if _is_admin_authenticated() else _requested_calendar_id()
+    return calendar_id or ''
+
+def _claim_idempotency_key(key: str, request_hash: str):
+    """
+    Insert a pending row for (endpoint, scope, key).
+
+    Returns (row, None) when this request owns the key, or (None, response)
+    when it is a duplicate: the stored response, 422 for a different
+    request under the same key, or 409 if the first request is still
+    running after IDEMPOTENCY_WAIT_MS. A pending row older than
+    IDEMPOTENCY_PENDING_SECONDS belongs to a request that died and is
+    taken over.
+    """
+    deadline = time.monotonic() + int(os.getenv('IDEMPOTENCY_WAIT_MS', '10000')) / 1000
+    pending_timeout = timedelta(seconds=int(os.getenv('IDEMPOTENCY_PENDING_SECONDS', '60')))
+    scope = _idempotency_scope()
+    db.session.execute(db.delete(IdempotencyKey).where(IdempotencyKey.expires_at < _utcnow()))
+    while True:
+        now = _utcnow()
+        row = IdempotencyKey(
+            endpoint=request.endpoint,
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            status='pending',
+            created_at=now,
+            expires_at=now + timedelta(hours=int(os.getenv('IDEMPOTENCY_TTL_HOURS', '24'))),
+        )
+        db.session.add(row)
+        try:
+            db.session.commit()
+            return row, None
+        except IntegrityError:
+            db.session.rollback()
+
+        # Poll with plain SELECTs; only claim again once the row is gone.
+        while True:
+            existing = IdempotencyKey.query.filter_by(endpoint=request.endpoint, scope=scope, key=key).first()
+            if existing is None:
+                break  # finished and expired in between; claim it again
+            if existing.request_hash != request_hash:
+                db.session.rollback()
+                return None, (jsonify({
+                    'success': False,
+                    'message': 'Idempotency-Key was already used for a different request',
+                }), 422)
+            if existing.status == 'done':
+                app.logger.info("Replaying %s response for idempotency key", request.endpoint)
+                response = _replay_response(existing)
+                db.session.rollback()
+                return None, response
+            if existing.created_at < _utcnow() - pending_timeout:
+                app.logger.warning("Taking over abandoned idempotency key for %s", request.endpoint)
+                db.session.delete(existing)
+                db.session.commit()
+                break
+            if time.monotonic() >= deadline:
+                db.session.rollback()
+                response = jsonify({'success': False, 'message': 'A request with this Idempotency-Key is still in progress'})
+                response.status_code = 409
+                response.headers['Retry-After'] = '1'
+                return None, response
+            # Join the in-flight request: wait for it to store its response.
+            db.session.rollback()
+            time.sleep(0.05)
+
+def idempotent(f):
+    """
+    Honour an Idempotency-Key header on a write endpoint.
+
+    The first request with a key runs normally and its response is stored
+    (unless it is a 5xx, so the client can retry). Later requests with the
+    same key and body get that response back without running the view,
+    and concurrent ones wait for the first to finish.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return f(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > 200:
+            return jsonify({'success': False, 'message': 'Idempotency-Key must be 1-200 characters'}), 400
+        request_hash = hashlib.sha256(request.full_path.encode() + b"\n" + request.get_data()).hexdigest()
+        try:
+            row, duplicate = _claim_idempotency_key(key, request_hash)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            app.logger.error("Database error claiming idempotency key: %s", e)
+            return jsonify({'success': False, 'message': 'Database error'}), 500
+        if duplicate is not None:
+            return duplicate
+
+        row_id = row.id
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            db.session.execute(db.delete(IdempotencyKey).where(IdempotencyKey.id == row_id))
+            db.session.commit()
+            raise
+        db.session.rollback()  # the view has committed or rolled back its own work
+        if response.status_code >= 500:
+            db.session.execute(db.delete(IdempotencyKey).where(IdempotencyKey.id == row_id))
+        else:
+            db.session.execute(
+                update(IdempotencyKey).where(IdempotencyKey.id == row_id).values(
+                    status='done',
+                    response_status=response.status_code,
+                    response_body=response.get_data(as_text=True),
+                )
+            )
+        db.session.commit()
+        return response
+    return decorated_function
 
 @app.route('/api/signup', methods=['POST'])
+@idempotent
 def signup():
     data = request.get_json(silent=True)
     app.logger.info("Signup attempt received")
@@ -294,56 +1621,52 @@ def signup():
     try:
         end_of_term = _parse_end_of_term(os.getenv('END_OF_TERM')) if repeat else None
     except ValueError as e:
-        app.logger.error(str(e))
+        app.logger.error("%s", e)
         return jsonify({'success': False, 'message': str(e)}), 500
 
     timeslot = db.session.get(TimeSlot, slot_id)
     if not timeslot:
-        app.logger.warning(f"Failed to book slot {slot_id}: Slot not available")
+        app.logger.warning("Failed to book slot %s: Slot not available", slot_id)
         return jsonify({'success': False, 'message': 'Time slot not available or invalid'}), 400
 
     slot_start = timeslot.start_time
     slot_end = timeslot.end_time
     slot_location = timeslot.location
+    calendar_id = timeslot.calendar_id
     slot_duration = slot_end - slot_start
+    series_id = str(uuid.uuid4()) if repeat else None
+    # Computed before taking the write lock; it only depends on the slot.
+    repeat_occurrences = (
+        list(_repeated_occurrences(slot_start, slot_duration, end_of_term))
+        if repeat
+        else []
+    )
 
     try:
         # Atomic transition: only one request can book an available slot.
         update_result = db.session.execute(
             text(
                 "UPDATE time_slot "
-                "SET is_available = :is_available, name = :name, is_repeated = :is_repeated "
+                "SET is_available = :is_available, name = :name, is_repeated = :is_repeated, "
+                "series_id = :series_id "
                 "WHERE id = :id AND is_available = :expected_available"
             ),
             {
                 "is_available": False,
                 "name": name,
                 "is_repeated": repeat,
+                "series_id": series_id,
                 "id": slot_id,
                 "expected_available": True,
             }
         )
         if update_result.rowcount != 1:
             db.session.rollback()
-            app.logger.warning(f"Failed to book slot {slot_id}: Slot already booked")
+            app.logger.warning("Failed to book slot %s: Slot already booked", slot_id)
             return jsonify({'success': False, 'message': 'Time slot not available or invalid'}), 409
 
-        repeat_occurrences = (
-            list(_repeated_occurrences(slot_start, slot_duration, end_of_term))
-            if repeat
-            else []
-        )
         if repeat_occurrences:
-            conflict_filters = [
-                (TimeSlot.start_time < repeated_end) & (TimeSlot.end_time > repeated_start)
-                for repeated_start, repeated_end in repeat_occurrences
-            ]
-            repeated_conflicts = (
-                TimeSlot.query.filter(TimeSlot.is_available == False)
-                .filter(or_(*conflict_filters))
-                .order_by(TimeSlot.start_time)
-                .all()
-            )
+            repeated_conflicts = _find_occurrence_conflicts(repeat_occurrences, calendar_id)
             if repeated_conflicts:
                 db.session.rollback()
                 return (
@@ -364,14 +1687,15 @@ def signup():
                     409,
                 )
 
-        if repeat:
-            app.logger.info(f"Creating repeated slots for {name}")
-            for repeated_start, repeated_end in repeat_occurrences:
-                db.session.execute(
-                    text(
-                        "INSERT INTO time_slot (start_time, end_time, is_available, name, location, is_repeated) "
-                        "VALUES (:start_time, :end_time, :is_available, :name, :location, :is_repeated)"
-                    ),
+        booked_ids = [slot_id]
+        if repeat_occurrences:
+            app.logger.info("Creating %s repeated slots for %s", len(repeat_occurrences), name)
+            # One multi-row INSERT (executemany with RETURNING) for the whole series.
+            repeated_ids = db.session.execute(
+                TimeSlot.__table__.insert().returning(
+                    TimeSlot.__table__.c.id, sort_by_parameter_order=True
+                ),
+                [
                     {
                         "start_time": repeated_start,
                         "end_time": repeated_end,
@@ -379,123 +1703,246 @@ def signup():
                         "name": name,
                         "location": slot_location,
                         "is_repeated": True,
+                        "series_id": series_id,
+                        "calendar_id": calendar_id,
                     }
-                )
-                app.logger.debug(f"Created repeated slot: {repeated_start} - {repeated_end}")
-
-        db.session.commit()
-        app.logger.info(f"Successfully booked slot(s) for {name}")
-
+                    for repeated_start, repeated_end in repeat_occurrences
+                ],
+            ).scalars().all()
+            booked_ids.extend(repeated_ids)
+
+        _record_slot_changes(upserted=booked_ids, kinds=dict.fromkeys(booked_ids, 'booked'))
+        # Queued in the booking transaction; delivered after commit by the outbox worker.
+        owner = _calendar_info(calendar_id) if calendar_id else None
         send_confirmation_email(
             student_name=name,
             slot_start=slot_start,
             slot_end=slot_end,
-            location=slot_location
+            location=slot_location,
+            recipient=owner.email if owner else None,
         )
+        db.session.commit()
+        app.logger.info("Successfully booked slot(s) for %s", name)
+        _notify_outbox_worker()
 
         return jsonify({'success': True})
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_booked_overlap_error(e):
+            app.logger.error("Database error: %s", e)
+            return jsonify({'success': False, 'message': 'An error occurred while booking the slot'}), 500
+        app.logger.warning("Failed to book slot %s: overlaps a booked slot", slot_id)
+        return _booked_overlap_response(
+            [(slot_start, slot_end)] + repeat_occurrences,
+            message='Time slot overlaps an existing booked slot',
+            calendar_id=calendar_id,
+        )
     except SQLAlchemyError as e:
         db.session.rollback()
-        app.logger.error(f"Database error: {str(e)}")
+        app.logger.error("Database error: %s", e)
         return jsonify({'success': False, 'message': 'An error occurred while booking the slot'}), 500
 
+def _parse_slot_payload(slot) -> dict:
+    if not isinstance(slot, dict):
+        raise ValueError("Each slot must be an object")
+
+    start_time = _parse_local_datetime(slot.get('start_time'), 'start_time')
+    end_time = _parse_local_datetime(slot.get('end_time'), 'end_time')
+    if end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+
+    location = _normalize_location({"location": slot.get('location')})
+    if location is None:
+        raise ValueError("Field 'location' is required")
+
+    name = _normalize_optional_slot_name(slot.get('name'))
+    is_available = slot.get('is_available', True)
+    if not isinstance(is_available, bool):
+        raise ValueError("Field 'is_available' must be a boolean")
+
+    return {
+        "start_time": start_time,
+        "end_time": end_time,
+        "is_available": is_available,
+        "name": name,
+        "location": location,
+    }
+
+def _snapshot_to_change_set(slots: list) -> dict:
+    """Convert a legacy full-calendar snapshot into a change set (it never deletes)."""
+    created, updated = [], []
+    for slot in slots:
+        if not isinstance(slot, dict):
+            raise ValueError("Each slot must be an object")
+        slot_id = slot.get('id')
+        if slot_id is not None and str(slot_id).startswith('temp_'):
+            created.append(slot)
+        elif slot_id is not None and str(slot_id).isdigit():
+            updated.append(slot)
+    return {"created": created, "updated": updated, "deleted": []}
+
 @app.route('/api/admin/set_timeslots', methods=['POST'])
 @admin_required
 def set_timeslots():
-    slots = request.get_json(silent=True)
-    if not isinstance(slots, list):
+    """
+    Apply a change set of slot edits.
+
+    Request JSON (preferred):
+      - created: [{id: "temp_...", start_time, end_time, location, is_available, name}, ...]
+      - updated: [{id, start_time, end_time, location, is_available, name}, ...]
+      - deleted: [id, ...]
+
+    A JSON array (the whole calendar snapshot) is still accepted: temp_ ids
+    are created, other ids updated, and nothing is deleted.
+
+    Only the referenced ids are read. Updates to ids that no longer exist
+    (or belong to another calendar) are skipped. The response maps each temp
+    id to the id it was saved as.
+    """
+    payload = request.get_json(silent=True)
+    try:
+        if isinstance(payload, list):
+            change_set = _snapshot_to_change_set(payload)
+        elif isinstance(payload, dict):
+            change_set = {
+                key: payload.get(key) or []
+                for key in ("created", "updated", "deleted")
+            }
+            if not all(isinstance(value, list) for value in change_set.values()):
+                raise ValueError("Fields 'created', 'updated' and 'deleted' must be arrays")
+        else:
+            raise ValueError("Request body must be a change set object or a JSON array of slots")
+
+        temp_ids = []
+        created_rows = []
+        for slot in change_set["created"]:
+            row = _parse_slot_payload(slot)
+            temp_ids.append(str(slot.get('id')))
+            created_rows.append(row)
+
+        updated_rows = {}
+        for slot in change_set["updated"]:
+            row = _parse_slot_payload(slot)
+            try:
+                slot_id = int(slot.get('id'))
+            except (TypeError, ValueError):
+                raise ValueError("Updated slots must have an integer 'id'")
+            # First occurrence of an id wins, as in the snapshot format.
+            updated_rows.setdefault(slot_id, row)
+
+        try:
+            deleted_ids = {int(slot_id) for slot_id in change_set["deleted"]}
+        except (TypeError, ValueError):
+            raise ValueError("Deleted ids must be integers")
+    except ValueError as e:
         return jsonify({
             "success": False,
-            "message": "Request body must be a JSON array of slots"
+            "message": str(e)
         }), 400
-    app.logger.info(f"Received {len(slots)} slots to set")
+
+    app.logger.info(
+        "Received change set: %d created, %d updated, %d deleted",
+        len(created_rows), len(updated_rows), len(deleted_ids),
+    )
+
+    calendar_id = _admin_calendar_id()
+    for row in created_rows:
+        row["calendar_id"] = calendar_id
 
     try:
-        # Start a transaction
-        db.session.begin_nested()
-
-        # Get all existing slots
-        existing_slots = {str(slot.id): slot for slot in TimeSlot.query.all()}
-        app.logger.debug(f"Found {len(existing_slots)} existing slots")
-
-        # Keep track of processed slots
-        processed_slots = set()
-
-        # Update or create slots
-        for slot in slots:
-            if not isinstance(slot, dict):
-                raise ValueError("Each slot must be an object")
-
-            slot_id = slot.get('id')
-            slot_id_str = str(slot_id) if slot_id is not None else None
-            start_time = _parse_local_datetime(slot.get('start_time'), 'start_time')
-            end_time = _parse_local_datetime(slot.get('end_time'), 'end_time')
-            if end_time <= start_time:
-                raise ValueError("end_time must be after start_time")
-
-            location = _normalize_location({"location": slot.get('location')})
-            if location is None:
-                raise ValueError("Field 'location' is required")
-
-            name = _normalize_optional_slot_name(slot.get('name'))
-            is_available = slot.get('is_available', True)
-            if not isinstance(is_available, bool):
-                raise ValueError("Field 'is_available' must be a boolean")
-
-            # Check if it's a new slot (temporary ID from frontend)
-            if slot_id_str and slot_id_str.startswith('temp_'):
-                app.logger.debug(f"Creating new slot: {start_time} - {end_time}")
-                new_slot = TimeSlot(
-                    start_time=start_time,
-                    end_time=end_time,
-                    is_available=is_available,
-                    name=name,
-                    location=location
+        referenced_ids = set(updated_rows) | deleted_ids
+        # id -> is_available for the referenced slots of this calendar that still exist.
+        existing = dict(
+            db.session.execute(
+                db.select(TimeSlot.id, TimeSlot.is_available).where(
+                    TimeSlot.id.in_(referenced_ids), TimeSlot.calendar_id == calendar_id
                 )
-                db.session.add(new_slot)
-                db.session.flush()  # This will assign an ID to the new slot
-                processed_slots.add(str(new_slot.id))
-                app.logger.info(f"Added new slot with ID {new_slot.id}")
-            elif slot_id_str in existing_slots and slot_id_str not in processed_slots:
-                app.logger.debug(f"Updating existing slot {slot_id_str}")
-                existing_slot = existing_slots[slot_id_str]
-                existing_slot.start_time = start_time
-                existing_slot.end_time = end_time
-                existing_slot.is_available = is_available
-                existing_slot.name = name
-                existing_slot.location = location
-                processed_slots.add(slot_id_str)
-                app.logger.info(f"Updated slot {slot_id_str}")
-
-        # Commit the transaction
+            ).all()
+        ) if referenced_ids else {}
+        existing_ids = set(existing)
+
+        id_map = {}
+        if created_rows:
+            new_ids = db.session.execute(
+                TimeSlot.__table__.insert().returning(
+                    TimeSlot.__table__.c.id, sort_by_parameter_order=True
+                ),
+                created_rows,
+            ).scalars().all()
+            id_map = dict(zip(temp_ids, new_ids))
+
+        update_params = [
+            {"id": slot_id, **row}
+            for slot_id, row in updated_rows.items()
+            if slot_id in existing_ids and slot_id not in deleted_ids
+        ]
+        if update_params:
+            # ORM bulk UPDATE by primary key: one executemany statement.
+            db.session.execute(update(TimeSlot), update_params)
+
+        removed_ids = []
+        if deleted_ids & existing_ids:
+            removed_ids = db.session.execute(
+                db.delete(TimeSlot)
+                .where(TimeSlot.id.in_(deleted_ids & existing_ids))
+                .returning(TimeSlot.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+
+        kinds = dict.fromkeys(id_map.values(), 'created')
+        for params in update_params:
+            was_available = existing[params["id"]]
+            if was_available and not params["is_available"]:
+                kinds[params["id"]] = 'booked'
+            elif not was_available and params["is_available"]:
+                kinds[params["id"]] = 'freed'
+            else:
+                kinds[params["id"]] = 'moved'
+        _record_slot_changes(
+            upserted=list(id_map.values()) + [params["id"] for params in update_params],
+            deleted=removed_ids,
+            kinds=kinds,
+        )
         db.session.commit()
-        app.logger.info(f"Successfully processed {len(processed_slots)} slots")
-        
+        processed = len(id_map) + len(update_params) + len(removed_ids)
+        app.logger.info("Successfully processed %s slots", processed)
+
         return jsonify({
-            "success": True, 
-            "message": f"Successfully processed {len(processed_slots)} slots"
+            "success": True,
+            "message": f"Successfully processed {processed} slots",
+            "id_map": id_map,
+            "created": len(id_map),
+            "updated": len(update_params),
+            "deleted": len(removed_ids),
         })
-    except ValueError as e:
+    except IntegrityError as e:
         db.session.rollback()
-        return jsonify({
-            "success": False,
-            "message": str(e)
-        }), 400
+        if not _is_booked_overlap_error(e):
+            app.logger.error("Error saving slots: %s", e)
+            return jsonify({
+                "success": False,
+                "message": f"Error saving slots: {str(e)}. Original data preserved."
+            }), 500
+        booked_rows = [row for row in created_rows if not row["is_available"]] + [
+            {"id": slot_id, **row} for slot_id, row in updated_rows.items() if not row["is_available"]
+        ]
+        return _booked_overlap_response(
+            [(row["start_time"], row["end_time"]) for row in booked_rows],
+            message='Booked slots would overlap an existing booked slot. Original data preserved.',
+            exclude_ids=[row["id"] for row in booked_rows if "id" in row],
+            calendar_id=calendar_id,
+        )
     except SQLAlchemyError as e:
         # Rollback the transaction
         db.session.rollback()
-        app.logger.error(f"Error saving slots: {str(e)}")
+        app.logger.error("Error saving slots: %s", e)
         return jsonify({
             "success": False,
             "message": f"Error saving slots: {str(e)}. Original data preserved."
         }), 500
 
-@app.route('/api/get_timeslots', methods=['GET'])
-def get_timeslots():
-    app.logger.info("Fetching all timeslots")
-    timeslots = TimeSlot.query.order_by(TimeSlot.start_time).all()
-    app.logger.debug(f"Found {len(timeslots)} timeslots")
-    return jsonify([{
+def _serialize_slot(slot):
+    return {
         'id': slot.id,
         'start_time': slot.start_time.isoformat(),
         'end_time': slot.end_time.isoformat(),
@@ -503,30 +1950,467 @@ def get_timeslots():
         'name': slot.name,
         'location': slot.location,
         'is_repeated': slot.is_repeated
-    } for slot in timeslots])
+    }
+
+# Serialized get_timeslots bodies per calendar and window, as
+# {(calendar_id, start, end): ((revision, updated_at), json_bytes, gzip_bytes)},
+# most recently used last. Per worker; only served while the revision matches.
+_timeslots_cache = OrderedDict()
+_timeslots_cache_lock = threading.Lock()  # gthread workers share the OrderedDict
+_TIMESLOTS_CACHE_SIZE = 64
+
+def _timeslots_snapshot(window_key, revision, updated_at):
+    """Return (json_bytes, gzip_bytes) for a window, rebuilding if the revision moved."""
+    with _timeslots_cache_lock:
+        cached = _timeslots_cache.get(window_key)
+        if cached is not None and cached[0] == (revision, updated_at):
+            _timeslots_cache.move_to_end(window_key)
+            return cached[1], cached[2]
+
+    calendar_id, window_start, window_end = window_key
+    query = TimeSlot.query.filter(TimeSlot.calendar_id == calendar_id)
+    if window_end is not None:
+        query = query.filter(TimeSlot.start_time < window_end)
+    if window_start is not None:
+        query = query.filter(TimeSlot.end_time > window_start)
+    timeslots = query.order_by(TimeSlot.start_time).all()
+    app.logger.debug("Found %s timeslots", len(timeslots))
+    plain = app.json.dumps([_serialize_slot(slot) for slot in timeslots]).encode()
+    compressed = gzip.compress(plain, compresslevel=6)
+    # Without a revision row there is nothing to invalidate against.
+    if updated_at is not None:
+        with _timeslots_cache_lock:
+            _timeslots_cache[window_key] = ((revision, updated_at), plain, compressed)
+            _timeslots_cache.move_to_end(window_key)
+            while len(_timeslots_cache) > _TIMESLOTS_CACHE_SIZE:
+                _timeslots_cache.popitem(last=False)
+    return plain, compressed
+
+@app.route('/api/get_timeslots', methods=['GET'])
+def get_timeslots():
+    """
+    Return a calendar's timeslots, optionally limited to a visible window.
+
+    Query parameters (all optional):
+      - calendar: calendar_id to read (defaults to the default calendar)
+      - start: only return slots ending after this instant (ISO date or datetime;
+        defaults to TERM_START when that is set)
+      - end: only return slots starting before this instant (ISO date or datetime)
+
+    FullCalendar passes its visible range as start/end, so a week view only
+    pulls the slots that overlap that week.
+    """
+    try:
+        window_start = _parse_range_param(request.args.get('start'), 'start')
+        if 'start' not in request.args:
+            window_start = _term_start()
+        window_end = _parse_range_param(request.args.get('end'), 'end')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if window_start and window_end and window_end <= window_start:
+        return jsonify({'success': False, 'message': "'end' must be after 'start'"}), 400
+
+    calendar_id = _requested_calendar_id()
+    app.logger.info("Fetching timeslots (calendar=%s, start=%s, end=%s)", calendar_id, window_start, window_end)
+    # Read the revision first: anything written after this point will show
+    # up in /api/timeslots/changes?since=<revision>.
+    revision, updated_at = _current_data_revision()
+    window_key = (calendar_id, window_start, window_end)
+    etag = hashlib.md5(
+        f"{revision}:{updated_at.isoformat() if updated_at else ''}:{calendar_id}:{window_start}:{window_end}".encode()
+    ).hexdigest()
+    use_gzip = request.accept_encodings['gzip'] > 0
+    # Strong ETags must differ per content-coding.
+    representation_etag = f"{etag}-gz" if use_gzip else etag
+
+    if request.if_none_match.contains(representation_etag):
+        response = Response(status=304)
+    else:
+        plain, compressed = _timeslots_snapshot(window_key, revision, updated_at)
+        response = Response(compressed if use_gzip else plain, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(representation_etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Data-Revision'] = str(revision)
+    return response
+
+def _parse_minutes(value, field_name: str, max_minutes: int = 24 * 60) -> int:
+    """Parse a positive duration such as '60m', '1h' or '90' (minutes), at most max_minutes."""
+    match = re.fullmatch(r'(\d+)(m|h)?', value.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Parameter '{field_name}' must look like '60m' or '1h'")
+    minutes = int(match.group(1)) * (60 if match.group(2) == 'h' else 1)
+    if minutes > max_minutes:
+        raise ValueError(f"Parameter '{field_name}' must be at most {max_minutes} minutes")
+    return minutes
+
+def _free_runs(rows):
+    """
+    Sweep slot rows sorted by start_time into free stretches.
+
+    Available slots at the same location that touch or overlap merge into
+    one stretch, then booked slots are cut out of it. Returns
+    [(start, end, location, fragments)] where fragments are the
+    (start, end, id) of the available slots the stretch was built from.
+    """
+    # Booked slots in a calendar never overlap, so sorted by start they are sorted by end too.
+    booked = [(row.start_time, row.end_time) for row in rows if not row.is_available]
+    booked_ends = [end for _, end in booked]
+    open_runs = {}
+    runs = []
+    for row in rows:
+        if not row.is_available:
+            continue
+        run = open_runs.get(row.location)
+        if run is not None and row.start_time <= run[1]:
+            run[1] = max(run[1], row.end_time)
+            run[3].append((row.start_time, row.end_time, row.id))
+            continue
+        if run is not None:
+            runs.append(run)
+        open_runs[row.location] = [row.start_time, row.end_time, row.location, [(row.start_time, row.end_time, row.id)]]
+    runs.extend(open_runs.values())
+
+    free = []
+    for start, end, location, fragments in runs:
+        cursor = start
+        index = bisect.bisect_right(booked_ends, start)
+        while index < len(booked) and booked[index][0] < end:
+            booked_start, booked_end = booked[index]
+            if booked_start > cursor:
+                free.append((cursor, booked_start, location, fragments))
+            cursor = max(cursor, booked_end)
+            index += 1
+        if cursor < end:
+            free.append((cursor, end, location, fragments))
+    return sorted(free, key=lambda run: run[0])
+
+def _snap_up(moment: datetime, grid: timedelta) -> datetime:
+    """Round up to the next multiple of grid counted from that day's midnight."""
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight - ((midnight - moment) // grid) * grid
+
+@app.route('/api/availability/search', methods=['GET'])
+def search_availability():
+    """
+    Find the next free windows of a given length in a calendar.
+
+    Query parameters:
+      - duration: window length such as '60m' or '1h' (required)
+      - from / to: search range, ISO date or datetime (default now and
+        AVAILABILITY_SEARCH_DAYS after it)
+      - location: only use available slots at this location
+      - grid: minutes past midnight windows may start on (default AVAILABILITY_GRID_MINUTES)
+      - limit: how many windows to return (default 10, at most 100)
+      - calendar: calendar_id to search (defaults to the default calendar)
+
+    Reads the range with one indexed query and sweeps it, so fragments left
+    by book_supervision still add up to a window. Windows within one free
+    stretch are back to back.
+    """
+    try:
+        if not request.args.get('duration'):
+            raise ValueError("Parameter 'duration' is required")
+        duration = timedelta(minutes=_parse_minutes(request.args['duration'], 'duration'))
+        grid = timedelta(minutes=_parse_minutes(
+            request.args.get('grid') or os.getenv('AVAILABILITY_GRID_MINUTES', '15'), 'grid'))
+        window_start = _parse_range_param(request.args.get('from'), 'from') or datetime.now(london_tz).replace(tzinfo=None)
+        try:
+            window_end = _parse_range_param(request.args.get('to'), 'to') or (
+                window_start + timedelta(days=int(os.getenv('AVAILABILITY_SEARCH_DAYS', '28')))
+            )
+        except OverflowError:
+            raise ValueError("Parameter 'from' is out of range")
+        limit = int(request.args.get('limit', '10'))
+        if not 1 <= limit <= 100:
+            raise ValueError("Parameter 'limit' must be between 1 and 100")
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if window_end <= window_start:
+        return jsonify({'success': False, 'message': "'to' must be after 'from'"}), 400
+
+    calendar_id = _requested_calendar_id()
+    location = (request.args.get('location') or '').strip() or None
+    app.logger.info(
+        "Searching availability (calendar=%s, duration=%s, from=%s, to=%s, location=%s)",
+        calendar_id, duration, window_start, window_end, location,
+    )
+    query = db.select(
+        TimeSlot.id, TimeSlot.start_time, TimeSlot.end_time, TimeSlot.is_available, TimeSlot.location
+    ).where(
+        TimeSlot.calendar_id == calendar_id,
+        TimeSlot.start_time < window_end,
+        TimeSlot.end_time > window_start,
+    ).order_by(TimeSlot.start_time)
+    if location is not None:
+        # Bookings anywhere still block the supervisor.
+        query = query.where(db.or_(TimeSlot.is_available == False, TimeSlot.location == location))
+    rows = db.session.execute(query).all()
+
+    windows = []
+    for run_start, run_end, run_location, fragments in _free_runs(rows):
+        # Stretches come in start order, so none after this one can beat a full list.
+        if len(windows) >= limit and run_start >= windows[-1]['start']:
+            break
+        cursor = _snap_up(max(run_start, window_start), grid)
+        found = 0
+        while cursor + duration <= min(run_end, window_end) and found < limit:
+            windows.append({
+                'start': cursor,
+                'end': cursor + duration,
+                'location': run_location,
+                'slot_ids': [
+                    slot_id for start, end, slot_id in fragments
+                    if start < cursor + duration and end > cursor
+                ],
+            })
+            cursor += duration
+            found += 1
+        windows.sort(key=lambda window: window['start'])
+        del windows[limit:]
+
+    return jsonify({
+        'duration_minutes': duration // timedelta(minutes=1),
+        'grid_minutes': grid // timedelta(minutes=1),
+        'from': window_start.isoformat(),
+        'to': window_end.isoformat(),
+        'windows': [
+            {**window, 'start': window['start'].isoformat(), 'end': window['end'].isoformat()}
+            for window in windows
+        ],
+    })
+
+def _slot_changes_since(since: int, calendar_id=None):
+    """
+    Return (revision, changes) for everything logged after `since`.
+
+    Upserts are limited to calendar_id's slots. Deletes are not (a deleted
+    slot's owner is gone); clients ignore ids they don't have.
+
+    changes is None when the log cannot serve `since` (pruned, or ahead of
+    the server) and the client has to refetch everything.
+    """
+    revision, _ = _current_data_revision()
+    oldest_logged = db.session.execute(db.select(func.min(SlotChange.revision))).scalar()
+    # Changes at or below the oldest logged revision - 1 may have been pruned.
+    floor = oldest_logged - 1 if oldest_logged is not None else revision
+    if since < floor or since > revision:
+        return revision, None
+    if since == revision:
+        return revision, []
+
+    rows = db.session.execute(
+        db.select(SlotChange.slot_id, SlotChange.op, SlotChange.kind)
+        .where(SlotChange.revision > since, SlotChange.revision <= revision)
+        .order_by(SlotChange.revision, SlotChange.id)
+    ).all()
+    # Only the latest change per slot matters to the client.
+    latest = {}
+    for row in rows:
+        latest.pop(row.slot_id, None)
+        latest[row.slot_id] = row
+
+    upserted_ids = [slot_id for slot_id, row in latest.items() if row.op == 'upsert']
+    slots = (
+        {slot.id: slot for slot in TimeSlot.query.filter(TimeSlot.id.in_(upserted_ids)).all()}
+        if upserted_ids
+        else {}
+    )
+    changes = []
+    for slot_id, row in latest.items():
+        slot = slots.get(slot_id)
+        if row.op == 'upsert' and slot is not None:
+            if slot.calendar_id != calendar_id:
+                continue
+            changes.append({'op': 'upsert', 'kind': row.kind, 'slot': _serialize_slot(slot)})
+        else:
+            changes.append({'op': 'delete', 'kind': row.kind or 'deleted', 'id': slot_id})
+    return revision, changes
+
+@app.route('/api/timeslots/changes', methods=['GET'])
+def get_timeslot_changes():
+    """
+    Return the slots that changed after revision `since`, for the calendar
+    named by the optional `calendar` parameter.
+
+    Response JSON:
+      - revision: the revision the client is now up to date with
+      - changes: [{"op": "upsert", "kind": "booked", "slot": {...}}
+                  | {"op": "delete", "kind": "deleted", "id": 5}, ...]
+
+    Returns 410 with resync_required=true when the change log no longer goes
+    back far enough (or `since` is ahead of the server); the client should
+    then refetch /api/get_timeslots.
+    """
+    try:
+        since = int(request.args.get('since', ''))
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'message': "Parameter 'since' must be a non-negative integer"}), 400
+
+    revision, changes = _slot_changes_since(since, _requested_calendar_id())
+    if changes is None:
+        app.logger.info("Change log cannot serve since=%s (revision=%s)", since, revision)
+        return jsonify({
+            'success': False,
+            'resync_required': True,
+            'revision': revision,
+            'message': 'Change log does not cover this revision; refetch all timeslots',
+        }), 410
+
+    return jsonify({'success': True, 'revision': revision, 'changes': changes})
+
+class _RevisionWatcher:
+    """
+    Per-process poller that wakes open SSE streams when the data revision moves.
+
+    However many streams a worker holds, it runs one single-row revision query
+    per poll interval, and none at all while no stream is waiting.
+    """
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.revision = None
+        self.waiters = 0
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.waiters > 0)
+            try:
+                with app.app_context():
+                    revision, _ = _current_data_revision()
+                    db.session.remove()
+            except Exception:
+                app.logger.exception("Revision watcher failed")
+            else:
+                with self.condition:
+                    if revision != self.revision:
+                        self.revision = revision
+                        self.condition.notify_all()
+            time.sleep(self.poll_seconds)
+
+    def wait_for_change(self, seen: int, timeout: float):
+        """Block until the revision passes `seen` or timeout; return the latest known."""
+        with self.condition:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='revision-watcher', daemon=True)
+                self.thread.start()
+            self.waiters += 1
+            self.condition.notify_all()
+            try:
+                self.condition.wait_for(
+                    lambda: self.revision is not None and self.revision > seen, timeout
+                )
+                return self.revision
+            finally:
+                self.waiters -= 1
+
+_revision_watcher = _RevisionWatcher(float(os.getenv('SSE_POLL_SECONDS', '1')))
+# Streams a worker may hold open at once. Keep at 0 with sync gunicorn
+# workers so no worker is pinned per browser; raise it for gthread/gevent.
+_sse_stream_slots = threading.BoundedSemaphore(int(os.getenv('SSE_MAX_STREAMS_PER_WORKER', '0')))
+
+def _sse_message(event_name, revision, data=None) -> str:
+    message = f"id: {revision}\n"
+    if event_name:
+        message += f"event: {event_name}\ndata: {json.dumps(data)}\n"
+    return message + "\n"
+
+@app.route('/api/timeslots/stream', methods=['GET'])
+def stream_timeslot_changes():
+    """
+    Server-Sent Events feed of slot changes (optional `calendar` parameter).
+
+    Each `changes` event carries the same body as /api/timeslots/changes and
+    uses the revision as its event id, so EventSource resumes via
+    Last-Event-ID. A `resync` event means the client must refetch everything.
+
+    If this worker already holds SSE_MAX_STREAMS_PER_WORKER streams, the
+    request gets whatever is pending and is closed straight away; the browser
+    reconnects after SSE_RETRY_MS, which degrades to cheap polling rather
+    than tying up more workers. Held streams close after SSE_STREAM_SECONDS.
+    """
+    resume_from = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since = int(resume_from) if resume_from else None
+        if since is not None and since < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'message': "Parameter 'since' must be a non-negative integer"}), 400
+
+    calendar_id = _requested_calendar_id()
+    retry_ms = int(os.getenv('SSE_RETRY_MS', '3000'))
+    stream_seconds = float(os.getenv('SSE_STREAM_SECONDS', '25'))
+    held = _sse_stream_slots.acquire(blocking=False)
+
+    def generate():
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            cursor = since
+            if cursor is None:
+                cursor, _ = _current_data_revision()
+                yield _sse_message(None, cursor)
+            deadline = time.monotonic() + (stream_seconds if held else 0)
+            while True:
+                revision, changes = _slot_changes_since(cursor, calendar_id)
+                # Don't keep a pooled connection checked out while idle.
+                db.session.remove()
+                if changes is None:
+                    yield _sse_message('resync', revision, {'revision': revision})
+                    return
+                if changes:
+                    yield _sse_message('changes', revision, {'revision': revision, 'changes': changes})
+                cursor = revision
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                latest = _revision_watcher.wait_for_change(cursor, min(remaining, 15))
+                if latest is None or latest <= cursor:
+                    yield ": keepalive\n\n"
+        finally:
+            if held:
+                _sse_stream_slots.release()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({"ok": True})
+    return jsonify({"ok": True, "database": _db_profile})
 
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
         app.logger.info("Admin login attempt")
-        password = request.form.get('password')
+        password = request.form.get('password') or ''
+        username = (request.form.get('username') or '').strip()
         try:
             admin = ensure_admin_account()
         except RuntimeError as e:
-            app.logger.error(str(e))
+            app.logger.error("%s", e)
             return render_template('admin_login.html', error='Server configuration error'), 500
+        if username:
+            # Each supervisor signs in to their own calendar; without a
+            # username the password is checked against the default admin.
+            admin = Admin.query.filter_by(username=username).first()
         if admin and check_password_hash(admin.password_hash, password):
             session['admin_logged_in'] = True
             session['admin_username'] = admin.username
-            app.logger.info(f"Admin login successful: {admin.username}")
+            session['admin_calendar_id'] = admin.calendar_id
+            app.logger.info("Admin login successful: %s", admin.username)
             return redirect(url_for('admin'))
         else:
-            app.logger.warning("Admin login failed: Invalid password")
-            return render_template('admin_login.html', error='Invalid password')
+            app.logger.warning("Admin login failed: Invalid username or password")
+            return render_template('admin_login.html', error='Invalid username or password')
     return render_template('admin_login.html')
 
 @app.route('/admin')
@@ -536,62 +2420,222 @@ def admin():
         return redirect(url_for('admin_login'))
     
     app.logger.info("Accessing admin page")
-    try:
-        admin = ensure_admin_account()
-    except RuntimeError as e:
-        app.logger.error(str(e))
-        return "Server configuration error", 500
+    calendar_id = _admin_calendar_id()
+    calendar = _calendar_info(calendar_id) if calendar_id else None
+    if calendar is None:
+        app.logger.warning("Admin page: calendar for %s no longer exists", session.get('admin_username'))
+        session.clear()
+        return redirect(url_for('admin_login'))
     
     supervision_start_date = os.getenv('SUPERVISION_START_DATE')
-    calendar_url = url_for('export_calendar', calendar_id=admin.calendar_id, _external=True)
+    calendar_url = url_for('export_calendar', calendar_id=calendar.calendar_id, _external=True)
     webcal_url = calendar_url.replace('http://', 'webcal://').replace('https://', 'webcal://')
-    return render_template('admin.html', supervision_start_date=supervision_start_date, calendar_url=webcal_url)
+    return render_template(
+        'admin.html',
+        supervision_start_date=supervision_start_date,
+        calendar_url=webcal_url,
+        calendar_id=calendar.calendar_id,
+        calendar_name=calendar.display_name,
+    )
 
 @app.route('/admin/logout')
 def admin_logout():
-    app.logger.info(f"Admin logout: {session.get('admin_username')}")
+    app.logger.info("Admin logout: %s", session.get('admin_username'))
     session.pop('admin_logged_in', None)
+    session.pop('admin_calendar_id', None)
     return redirect(url_for('index'))
 
+_ARCHIVED_COLUMNS = (
+    'start_time', 'end_time', 'is_available', 'name', 'location', 'is_repeated', 'series_id', 'calendar_id',
+)
+
+def archive_slots(before: datetime, calendar_id=None, batch_size=None, dry_run=False) -> dict:
+    """
+    Move slots that ended before `before` into time_slot_archive.
+
+    Works in batches of ARCHIVE_BATCH_SIZE rows, each copied, deleted and
+    logged as 'archived' in its own transaction, so writers are only
+    blocked briefly. Returns {'archived', 'batches'}.
+    """
+    batch_size = batch_size or int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+    candidates = db.select(TimeSlot.id).where(TimeSlot.end_time < before)
+    if calendar_id is not None:
+        candidates = candidates.where(TimeSlot.calendar_id == calendar_id)
+    if dry_run:
+        count = db.session.execute(db.select(func.count()).select_from(candidates.subquery())).scalar_one()
+        return {'archived': count, 'batches': 0}
+
+    archived = batches = 0
+    while True:
+        ids = db.session.execute(candidates.order_by(TimeSlot.id).limit(batch_size)).scalars().all()
+        if not ids:
+            break
+        # Repeat the cutoff: a slot moved into the current term since the
+        # select stays. Only the rows actually deleted are archived.
+        rows = db.session.execute(
+            db.delete(TimeSlot)
+            .where(TimeSlot.id.in_(ids), TimeSlot.end_time < before)
+            .returning(TimeSlot.id, *(getattr(TimeSlot, column) for column in _ARCHIVED_COLUMNS))
+            .execution_options(synchronize_session=False)
+        ).all()
+        if rows:
+            archived_at = _utcnow()
+            db.session.execute(insert(ArchivedTimeSlot), [
+                {'slot_id': row.id, **{column: getattr(row, column) for column in _ARCHIVED_COLUMNS},
+                 'archived_at': archived_at}
+                for row in rows
+            ])
+            deleted_ids = [row.id for row in rows]
+            _record_slot_changes(deleted=deleted_ids, kinds=dict.fromkeys(deleted_ids, 'archived'))
+        db.session.commit()
+        archived += len(rows)
+        batches += 1
+    db.session.expire_all()
+    if archived:
+        app.logger.info("Archived %s slots ending before %s in %s batches", archived, before, batches)
+    return {'archived': archived, 'batches': batches}
+
+class CompactionConflict(Exception):
+    pass
+
+def compact_available_slots(calendar_id=None, after=None, before=None, dry_run=False) -> dict:
+    """
+    Merge touching or overlapping available pieces of the same slot.
+
+    Only rows book_supervision cut from one admin-created slot (the slot
+    itself and the rows whose split_from names it) are merged, so slots an
+    admin put back to back stay separate. Limited to one calendar and to
+    slots ending after `after` / starting before `before` when given. The
+    earliest slot of each run keeps its id and is stretched over the run;
+    the rest are deleted. Booked slots and slots in a repeating series are
+    never touched. Commits (unless dry_run)
+    and returns {'rows_removed', 'slots_extended'}; raises CompactionConflict
+    after rolling back if a candidate slot was booked meanwhile.
+    """
+    origin = func.coalesce(TimeSlot.split_from, TimeSlot.id)
+    query = db.select(
+        TimeSlot.id, TimeSlot.start_time, TimeSlot.end_time, TimeSlot.location, TimeSlot.calendar_id,
+        origin.label('origin'),
+    ).where(TimeSlot.is_available == True, TimeSlot.series_id.is_(None))
+    if calendar_id is not None:
+        query = query.where(TimeSlot.calendar_id == calendar_id)
+    if after is not None:
+        query = query.where(TimeSlot.end_time >= after)
+    if before is not None:
+        query = query.where(TimeSlot.start_time <= before)
+    rows = db.session.execute(
+        query.order_by(TimeSlot.calendar_id, TimeSlot.location, origin, TimeSlot.start_time, TimeSlot.id)
+    ).all()
+
+    extended = {}
+    removed = []
+    survivor = None
+    for row in rows:
+        if (
+            survivor is not None
+            and (row.calendar_id, row.location, row.origin) == (survivor.calendar_id, survivor.location, survivor.origin)
+            and row.start_time <= extended.get(survivor.id, survivor.end_time)
+        ):
+            removed.append(row.id)
+            if row.end_time > extended.get(survivor.id, survivor.end_time):
+                extended[survivor.id] = row.end_time
+            continue
+        survivor = row
+
+    if removed and not dry_run:
+        # Re-check is_available in the writes: a signup can book a candidate
+        # between the read above and here.
+        changed = 0
+        for slot_id, end in extended.items():
+            changed += db.session.execute(
+                update(TimeSlot)
+                .where(TimeSlot.id == slot_id, TimeSlot.is_available == True)
+                .values(end_time=end)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        for index in range(0, len(removed), 500):
+            changed += db.session.execute(
+                db.delete(TimeSlot)
+                .where(TimeSlot.id.in_(removed[index:index + 500]), TimeSlot.is_available == True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        if changed != len(extended) + len(removed):
+            db.session.rollback()
+            raise CompactionConflict("Slots were booked while compacting; nothing was changed")
+        _record_slot_changes(upserted=list(extended), deleted=removed, kinds=dict.fromkeys(extended, 'moved'))
+        db.session.commit()
+        db.session.expire_all()
+        app.logger.info("Compacted available slots: removed %s rows, extended %s", len(removed), len(extended))
+    return {'rows_removed': len(removed), 'slots_extended': len(extended)}
+
+def _compact_after_delete(calendar_id, after, before):
+    """Best-effort compaction around deleted slots; a failure never fails the delete."""
+    if os.getenv('COMPACT_AFTER_DELETE', 'true').lower() != 'true':
+        return
+    try:
+        compact_available_slots(calendar_id, after, before)
+    except (SQLAlchemyError, CompactionConflict) as e:
+        db.session.rollback()
+        app.logger.warning("Compaction after delete failed: %s", e)
+
+def _rest_of_series(slot):
+    """
+    WHERE criteria for `slot` and the later occurrences of its series.
+
+    series_id stays on occurrences that were freed or rebooked for someone
+    else, so those are excluded the way the old pattern match excluded them.
+    """
+    return (
+        TimeSlot.series_id == slot.series_id,
+        TimeSlot.start_time >= slot.start_time,
+        TimeSlot.is_repeated == True,
+        TimeSlot.is_available == False,
+        TimeSlot.name == slot.name,
+    )
+
 @app.route('/api/admin/delete_timeslot/<int:id>', methods=['DELETE'])
 @admin_required
 def delete_timeslot(id):
-    app.logger.info(f"Attempting to delete timeslot {id}")
-    slot = TimeSlot.query.get(id)
+    app.logger.info("Attempting to delete timeslot %s", id)
+    slot = db.session.get(TimeSlot, id)
+    if slot is not None and slot.calendar_id != _admin_calendar_id():
+        slot = None  # another supervisor's slot
     if slot:
         delete_subsequent = request.args.get('delete_subsequent', 'false').lower() == 'true'
         
-        if delete_subsequent and slot.is_repeated:
-            app.logger.info(f"Deleting slot {id} and subsequent repeating slots")
-            subsequent_slots = TimeSlot.query.filter(
-                TimeSlot.start_time >= slot.start_time,
-                func.extract('dow', TimeSlot.start_time) == func.extract('dow', slot.start_time),
-                func.extract('hour', TimeSlot.start_time) == func.extract('hour', slot.start_time),
-                func.extract('minute', TimeSlot.start_time) == func.extract('minute', slot.start_time),
-                func.extract('hour', TimeSlot.end_time) == func.extract('hour', slot.end_time),
-                func.extract('minute', TimeSlot.end_time) == func.extract('minute', slot.end_time),
-                TimeSlot.is_repeated == True,
-                TimeSlot.name == slot.name
-            ).all()
-            
-            for subsequent_slot in subsequent_slots:
-                db.session.delete(subsequent_slot)
-                app.logger.debug(f"Deleted slot {subsequent_slot.id}")
+        calendar_id = slot.calendar_id
+        compact_after = slot.start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        compact_before = compact_after + timedelta(days=1)
+        if delete_subsequent and slot.is_repeated and slot.series_id and not slot.is_available:
+            compact_before = None
+            app.logger.info("Deleting slot %s and subsequent slots in series %s", id, slot.series_id)
+            deleted_ids = db.session.execute(
+                db.delete(TimeSlot)
+                .where(*_rest_of_series(slot))
+                .returning(TimeSlot.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            app.logger.debug("Deleted slots %s", deleted_ids)
         else:
-            app.logger.info(f"Deleting single slot {id}")
+            app.logger.info("Deleting single slot %s", id)
             db.session.delete(slot)
+            deleted_ids = [slot.id]
         
+        _record_slot_changes(deleted=deleted_ids)
         db.session.commit()
-        app.logger.info(f"Successfully deleted timeslot(s)")
+        app.logger.info("Successfully deleted timeslot(s)")
+        _compact_after_delete(calendar_id, compact_after, compact_before)
         return jsonify({'success': True})
-    app.logger.warning(f"Failed to delete timeslot {id}: Slot not found")
+    app.logger.warning("Failed to delete timeslot %s: Slot not found", id)
     return jsonify({'success': False, 'message': 'Time slot not found'})
 
 @app.route('/api/admin/change_location/<int:id>', methods=['POST'])
 @admin_required
 def change_location(id):
-    app.logger.info(f"Attempting to change location for timeslot {id}")
+    app.logger.info("Attempting to change location for timeslot %s", id)
     slot = db.session.get(TimeSlot, id)
+    if slot is not None and slot.calendar_id != _admin_calendar_id():
+        slot = None  # another supervisor's slot
     if slot:
         data = request.get_json(silent=True) or {}
         update_subsequent = bool(data.get('update_subsequent', False))
@@ -601,39 +2645,205 @@ def change_location(id):
             return jsonify({'success': False, 'message': str(e)}), 400
 
         if new_location is None:
-            app.logger.warning(f"Failed to update location for slot {id}: New location not provided")
+            app.logger.warning("Failed to update location for slot %s: New location not provided", id)
             return jsonify({'success': False, 'message': 'New location not provided'}), 400
 
-        if update_subsequent and slot.is_repeated:
-            app.logger.info(f"Updating location for slot {id} and subsequent repeating slots")
-            # Update this slot and all subsequent repeating slots
-            subsequent_slots = TimeSlot.query.filter(
-                TimeSlot.start_time >= slot.start_time,
-                func.extract('dow', TimeSlot.start_time) == func.extract('dow', slot.start_time),  # Match weekday
-                func.extract('hour', TimeSlot.start_time) == func.extract('hour', slot.start_time),  # Match start hour
-                func.extract('minute', TimeSlot.start_time) == func.extract('minute', slot.start_time),  # Match start minute
-                func.extract('hour', TimeSlot.end_time) == func.extract('hour', slot.end_time),  # Match end hour
-                func.extract('minute', TimeSlot.end_time) == func.extract('minute', slot.end_time),  # Match end minute
-                TimeSlot.is_repeated == True,
-                TimeSlot.name == slot.name
-            ).all()
-
-            for subsequent_slot in subsequent_slots:
-                subsequent_slot.location = new_location
-                app.logger.debug(f"Updated location for slot {subsequent_slot.id}")
+        if update_subsequent and slot.is_repeated and slot.series_id and not slot.is_available:
+            app.logger.info("Updating location for slot %s and subsequent slots in series %s", id, slot.series_id)
+            # Update this slot and all subsequent slots in its series
+            updated_ids = db.session.execute(
+                db.update(TimeSlot)
+                .where(*_rest_of_series(slot))
+                .values(location=new_location)
+                .returning(TimeSlot.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            app.logger.debug("Updated location for slots %s", updated_ids)
         else:
-            app.logger.info(f"Updating location for slot {id}")
+            app.logger.info("Updating location for slot %s", id)
             # Update only this slot
             slot.location = new_location
+            updated_ids = [slot.id]
 
+        _record_slot_changes(upserted=updated_ids, kinds=dict.fromkeys(updated_ids, 'relocated'))
         db.session.commit()
-        app.logger.info(f"Successfully updated location for slot {id}")
+        app.logger.info("Successfully updated location for slot %s", id)
         return jsonify({'success': True})
-    app.logger.warning(f"Failed to update location for slot {id}: Slot not found")
+    app.logger.warning("Failed to update location for slot %s: Slot not found", id)
     return jsonify({'success': False, 'message': 'Time slot not found'})
 
+def _slot_summary(slot) -> dict:
+    return {
+        "id": slot.id,
+        "start_time": slot.start_time.isoformat(),
+        "end_time": slot.end_time.isoformat(),
+        "name": slot.name,
+        "location": slot.location,
+    }
+
+def _parse_booking(payload: dict):
+    """Validated (start_time, end_time, name, location-or-None) for one booking; raises ValueError."""
+    start_time = _parse_local_datetime(payload.get("start_time"), "start_time")
+    end_time = _parse_local_datetime(payload.get("end_time"), "end_time")
+    if end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+    return start_time, end_time, _normalize_booking_name(payload), _normalize_location(payload)
+
+def _apply_booking(slots, start_time, end_time, booking_name, requested_location, calendar_id) -> dict:
+    """
+    Apply one booking to `slots`, the calendar's slots that may overlap it.
+
+    Edits the ORM objects in place without flushing, and keeps `slots`
+    current (deleted slots removed, new ones appended) so a batch can apply
+    bookings one after another against a single range query. Returns
+    {'action', 'slot', 'changed', 'created', 'deleted'} on success, or
+    {'status', 'message', 'conflicts'} with nothing touched when the booking
+    is rejected.
+    """
+    overlapping = sorted(
+        (s for s in slots if s.start_time < end_time and s.end_time > start_time),
+        key=lambda s: s.start_time,
+    )
+    applied = {"changed": [], "created": [], "deleted": []}
+
+    # If there's an exact matching booked slot, treat this as an update.
+    for slot in overlapping:
+        if (
+            slot.is_available is False
+            and slot.start_time == start_time
+            and slot.end_time == end_time
+        ):
+            slot.name = booking_name
+            if requested_location is not None:
+                slot.location = requested_location
+            return {"action": "updated", "slot": slot, **applied}
+
+    booked_conflicts = [s for s in overlapping if s.is_available is False]
+    if booked_conflicts:
+        return {
+            "status": 409,
+            "message": "Requested time overlaps an existing booked slot",
+            "conflicts": booked_conflicts,
+        }
+
+    # Infer location if not provided.
+    location = requested_location
+    if location is None:
+        locations = {s.location for s in overlapping if s.is_available and s.location}
+        if len(locations) != 1:
+            return {
+                "status": 400,
+                "message": "Field 'location' is required (could not infer from existing slots)",
+                "conflicts": [],
+            }
+        location = next(iter(locations))
+
+    # Exact match available slot: convert it in place (keeps ID for iCal UID stability).
+    for slot in overlapping:
+        if (
+            slot.is_available is True
+            and slot.start_time == start_time
+            and slot.end_time == end_time
+        ):
+            slot.is_available = False
+            slot.name = booking_name
+            slot.location = location
+            slot.is_repeated = False
+            return {"action": "booked_existing", "slot": slot, **applied}
+
+    # Otherwise: adjust any overlapping *available* slots to remove overlap, then insert the booked slot.
+    # Pieces remember the slot they were cut from so compaction can rejoin them.
+    origins = {s.split_from or s.id for s in overlapping if s.is_available}
+    for slot in overlapping:
+        # Fully covered: delete the slot.
+        if slot.start_time >= start_time and slot.end_time <= end_time:
+            if db.inspect(slot).pending:
+                db.session.expunge(slot)  # a fragment made earlier in the same batch
+            else:
+                db.session.delete(slot)
+            slots.remove(slot)
+            applied["deleted"].append(slot)
+            continue
+
+        # Overlap on the right: shrink end.
+        if slot.start_time < start_time < slot.end_time <= end_time:
+            slot.end_time = start_time
+            slot.name = None
+            slot.is_repeated = False
+            applied["changed"].append(slot)
+            continue
+
+        # Overlap on the left: move start.
+        if start_time <= slot.start_time < end_time < slot.end_time:
+            slot.start_time = end_time
+            slot.name = None
+            slot.is_repeated = False
+            applied["changed"].append(slot)
+            continue
+
+        # Target is strictly inside this available slot: split into left + right.
+        if slot.start_time < start_time and slot.end_time > end_time:
+            right = TimeSlot(
+                start_time=end_time,
+                end_time=slot.end_time,
+                is_available=True,
+                name=None,
+                location=slot.location,
+                is_repeated=False,
+                calendar_id=calendar_id,
+                split_from=slot.split_from or slot.id,
+            )
+            slot.end_time = start_time
+            slot.name = None
+            slot.is_repeated = False
+            db.session.add(right)
+            slots.append(right)
+            applied["changed"].append(slot)
+            applied["created"].append(right)
+
+    booked = TimeSlot(
+        start_time=start_time,
+        end_time=end_time,
+        is_available=False,
+        name=booking_name,
+        location=location,
+        is_repeated=False,
+        calendar_id=calendar_id,
+        split_from=next(iter(origins)) if len(origins) == 1 else None,
+    )
+    db.session.add(booked)
+    slots.append(booked)
+    return {"action": "created", "slot": booked, **applied}
+
+def _record_booking_changes(outcomes):
+    """Log the slot changes of applied bookings under one revision; call after a flush."""
+    deleted = [slot for outcome in outcomes for slot in outcome["deleted"]]
+    kinds = {}
+    for outcome in outcomes:
+        for slot in outcome["changed"]:
+            if kinds.get(slot) != "created":
+                kinds[slot] = "moved"
+        for slot in outcome["created"]:
+            kinds[slot] = "created"
+        kinds[outcome["slot"]] = "booked"
+    # A slot created and then deleted within a batch never got an id.
+    upserted = [slot for slot in kinds if slot not in deleted]
+    _record_slot_changes(
+        upserted=[slot.id for slot in upserted],
+        deleted=[slot.id for slot in deleted if slot.id is not None],
+        kinds={slot.id: kind for slot, kind in kinds.items() if slot in upserted},
+    )
+
+def _booking_slots_query(calendar_id, start_time, end_time):
+    return TimeSlot.query.filter(
+        TimeSlot.calendar_id == calendar_id,
+        TimeSlot.start_time < end_time,
+        TimeSlot.end_time > start_time,
+    )
+
 @app.route('/api/admin/book_supervision', methods=['POST'])
 @admin_required
+@idempotent
 def book_supervision():
     """
     Create or update a booked supervision slot.
@@ -644,7 +2854,7 @@ def book_supervision():
       - students: [str, ...] OR name: str (required)
       - location: str (optional; inferred from overlapping available slots if omitted)
 
-    Semantics:
+    Semantics (only the admin's own calendar is considered):
       - If an existing booked slot exactly matches (start_time, end_time), update its name/location.
       - If the requested time overlaps any other booked slot, return 409.
       - If it overlaps available slots, those are split/shrunk/deleted to avoid overlaps.
@@ -652,242 +2862,499 @@ def book_supervision():
     """
     payload = request.get_json(silent=True) or {}
     try:
-        start_time = _parse_local_datetime(payload.get("start_time"), "start_time")
-        end_time = _parse_local_datetime(payload.get("end_time"), "end_time")
-        if end_time <= start_time:
-            return jsonify({"success": False, "message": "end_time must be after start_time"}), 400
-
-        booking_name = _normalize_booking_name(payload)
-        requested_location = _normalize_location(payload)  # may be None
+        start_time, end_time, booking_name, requested_location = _parse_booking(payload)
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
 
+    calendar_id = _admin_calendar_id()
     try:
-        overlapping = (
-            TimeSlot.query.filter(TimeSlot.start_time < end_time, TimeSlot.end_time > start_time)
-            .order_by(TimeSlot.start_time)
-            .all()
-        )
+        slots = _booking_slots_query(calendar_id, start_time, end_time).all()
+        outcome = _apply_booking(slots, start_time, end_time, booking_name, requested_location, calendar_id)
+        if "status" in outcome:
+            body = {"success": False, "message": outcome["message"]}
+            if outcome["status"] == 409:
+                body["conflicts"] = [_slot_summary(s) for s in outcome["conflicts"]]
+            return jsonify(body), outcome["status"]
+
+        db.session.flush()
+        _record_booking_changes([outcome])
+        db.session.commit()
+        return jsonify({"success": True, "action": outcome["action"], **_slot_summary(outcome["slot"])})
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_booked_overlap_error(e):
+            app.logger.error("Database error booking supervision: %s", e)
+            return jsonify({"success": False, "message": "Database error"}), 500
+        # Lost a race with a concurrent booking; report it like the pre-check does.
+        return _booked_overlap_response([(start_time, end_time)], calendar_id=calendar_id)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        app.logger.error("Database error booking supervision: %s", e)
+        return jsonify({"success": False, "message": "Database error"}), 500
 
-        # If there's an exact matching booked slot, treat this as an update.
-        for slot in overlapping:
-            if (
-                slot.is_available is False
-                and slot.start_time == start_time
-                and slot.end_time == end_time
-            ):
-                slot.name = booking_name
-                if requested_location is not None:
-                    slot.location = requested_location
-                db.session.commit()
-                return jsonify(
-                    {
-                        "success": True,
-                        "action": "updated",
-                        "id": slot.id,
-                        "start_time": slot.start_time.isoformat(),
-                        "end_time": slot.end_time.isoformat(),
-                        "name": slot.name,
-                        "location": slot.location,
-                    }
-                )
+@app.route('/api/admin/book_supervision/batch', methods=['POST'])
+@admin_required
+@idempotent
+def book_supervision_batch():
+    """
+    Apply many bookings with one range query and one commit.
 
-        booked_conflicts = [s for s in overlapping if s.is_available is False]
-        if booked_conflicts:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": "Requested time overlaps an existing booked slot",
-                        "conflicts": [
-                            {
-                                "id": s.id,
-                                "start_time": s.start_time.isoformat(),
-                                "end_time": s.end_time.isoformat(),
-                                "name": s.name,
-                                "location": s.location,
-                            }
-                            for s in booked_conflicts
-                        ],
-                    }
-                ),
-                409,
-            )
+    Request JSON:
+      - bookings: [{start_time, end_time, students|name, location}, ...] (required)
+      - mode: "all_or_nothing" (default) or "per_item"
+
+    Bookings are applied in order with book_supervision's semantics, so a
+    later booking sees the slots earlier ones created, split or converted.
+    Each entry of `results` is book_supervision's response body plus `index`
+    and, for failures, `status`. In all_or_nothing mode any failure rolls
+    the batch back and returns 409 (400 if none of the failures is a
+    conflict) with only the failed entries and every conflict in
+    `conflicts`; in per_item mode the successful bookings are saved and the
+    response is 200 with a result for every booking.
+    """
+    payload = request.get_json(silent=True) or {}
+    bookings = payload.get("bookings")
+    mode = payload.get("mode", "all_or_nothing")
+    max_items = int(os.getenv('BOOKING_BATCH_MAX', '500'))
+    if not isinstance(bookings, list) or not bookings:
+        return jsonify({"success": False, "message": "Field 'bookings' must be a non-empty list"}), 400
+    if len(bookings) > max_items:
+        return jsonify({"success": False, "message": f"At most {max_items} bookings per batch"}), 400
+    if mode not in ("all_or_nothing", "per_item"):
+        return jsonify({"success": False, "message": "Field 'mode' must be 'all_or_nothing' or 'per_item'"}), 400
+
+    parsed = []
+    for booking in bookings:
+        try:
+            if not isinstance(booking, dict):
+                raise ValueError("Each booking must be an object")
+            parsed.append(_parse_booking(booking))
+        except ValueError as e:
+            parsed.append(e)
+    windows = [item[:2] for item in parsed if not isinstance(item, ValueError)]
 
-        # Infer location if not provided.
-        location = requested_location
-        if location is None:
-            locations = {s.location for s in overlapping if s.is_available and s.location}
-            if len(locations) == 1:
-                location = next(iter(locations))
+    calendar_id = _admin_calendar_id()
+    try:
+        slots = []
+        if windows:
+            slots = _booking_slots_query(
+                calendar_id, min(start for start, _ in windows), max(end for _, end in windows)
+            ).all()
+        outcomes = [
+            {"status": 400, "message": str(item), "conflicts": []} if isinstance(item, ValueError)
+            else _apply_booking(slots, *item, calendar_id)
+            for item in parsed
+        ]
+        # Flush even when rolling back: conflicts with bookings earlier in the batch need their ids.
+        db.session.flush()
+
+        results = []
+        for index, outcome in enumerate(outcomes):
+            if "status" in outcome:
+                result = {"index": index, "success": False, "status": outcome["status"], "message": outcome["message"]}
+                if outcome["status"] == 409:
+                    result["conflicts"] = [_slot_summary(s) for s in outcome["conflicts"]]
             else:
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "message": "Field 'location' is required (could not infer from existing slots)",
-                        }
-                    ),
-                    400,
-                )
+                result = {"index": index, "success": True, "action": outcome["action"], **_slot_summary(outcome["slot"])}
+            results.append(result)
+        failed = [result for result in results if not result["success"]]
+        applied = [outcome for outcome in outcomes if "status" not in outcome]
 
-        # Exact match available slot: convert it in place (keeps ID for iCal UID stability).
-        for slot in overlapping:
-            if (
-                slot.is_available is True
-                and slot.start_time == start_time
-                and slot.end_time == end_time
-            ):
-                slot.is_available = False
-                slot.name = booking_name
-                slot.location = location
-                slot.is_repeated = False
-                db.session.commit()
-                return jsonify(
-                    {
-                        "success": True,
-                        "action": "booked_existing",
-                        "id": slot.id,
-                        "start_time": slot.start_time.isoformat(),
-                        "end_time": slot.end_time.isoformat(),
-                        "name": slot.name,
-                        "location": slot.location,
-                    }
-                )
-
-        # Otherwise: adjust any overlapping *available* slots to remove overlap, then insert the booked slot.
-        for slot in overlapping:
-            if not slot.is_available:
-                continue
-
-            # Fully covered: delete the slot.
-            if slot.start_time >= start_time and slot.end_time <= end_time:
-                db.session.delete(slot)
-                continue
-
-            # Overlap on the right: shrink end.
-            if slot.start_time < start_time < slot.end_time <= end_time:
-                slot.end_time = start_time
-                slot.name = None
-                slot.is_repeated = False
-                continue
-
-            # Overlap on the left: move start.
-            if start_time <= slot.start_time < end_time < slot.end_time:
-                slot.start_time = end_time
-                slot.name = None
-                slot.is_repeated = False
-                continue
-
-            # Target is strictly inside this available slot: split into left + right.
-            if slot.start_time < start_time and slot.end_time > end_time:
-                right = TimeSlot(
-                    start_time=end_time,
-                    end_time=slot.end_time,
-                    is_available=True,
-                    name=None,
-                    location=slot.location,
-                    is_repeated=False,
-                )
-                slot.end_time = start_time
-                slot.name = None
-                slot.is_repeated = False
-                db.session.add(right)
-                continue
-
-        booked = TimeSlot(
-            start_time=start_time,
-            end_time=end_time,
-            is_available=False,
-            name=booking_name,
-            location=location,
-            is_repeated=False,
-        )
-        db.session.add(booked)
+        if failed and mode == "all_or_nothing":
+            db.session.rollback()
+            conflicts = {c["id"]: c for result in failed for c in result.get("conflicts", ())}
+            status = 409 if conflicts else 400
+            app.logger.info("Rejected booking batch: %s of %s bookings failed", len(failed), len(results))
+            return jsonify({
+                "success": False,
+                "message": f"{len(failed)} of {len(results)} bookings failed; nothing was saved",
+                "conflicts": sorted(conflicts.values(), key=lambda c: c["start_time"]),
+                "results": failed,
+            }), status
+
+        if applied:
+            _record_booking_changes(applied)
         db.session.commit()
-        return jsonify(
-            {
-                "success": True,
-                "action": "created",
-                "id": booked.id,
-                "start_time": booked.start_time.isoformat(),
-                "end_time": booked.end_time.isoformat(),
-                "name": booked.name,
-                "location": booked.location,
-            }
-        )
+        app.logger.info("Applied booking batch: %s of %s bookings", len(applied), len(results))
+        return jsonify({"success": not failed, "results": results})
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_booked_overlap_error(e):
+            app.logger.error("Database error booking supervision batch: %s", e)
+            return jsonify({"success": False, "message": "Database error"}), 500
+        return _booked_overlap_response(windows, calendar_id=calendar_id)
     except SQLAlchemyError as e:
         db.session.rollback()
-        app.logger.error(f"Database error booking supervision: {str(e)}")
+        app.logger.error("Database error booking supervision batch: %s", e)
         return jsonify({"success": False, "message": "Database error"}), 500
 
-@app.route('/api/export/<calendar_id>')
-def export_calendar(calendar_id):
-    app.logger.info(f"Exporting calendar for calendar_id: {calendar_id}")
-    admin = Admin.query.filter_by(calendar_id=calendar_id).first()
-    if not admin:
-        app.logger.warning(f"Calendar export failed: No admin found for calendar_id {calendar_id}")
-        return "Calendar not found", 404
+# Rendered feeds as {(calendar_id, after, before, include_archived): ((revision, updated_at), ical_bytes)},
+# most recently used last. Per worker; only feeds up to ICAL_CACHE_MAX_BYTES
+# are kept, and only served while their revision matches data_revision.
+_ical_cache = OrderedDict()
+_ical_cache_lock = threading.Lock()  # threaded workers share the OrderedDict
+_ICAL_CACHE_SIZE = 32
+_ICAL_CHUNK_BYTES = 64 * 1024
+
+def _parse_horizon(value, field_name: str):
+    """Parse an export horizon such as '90d' or '12w'; 'all' means unbounded (None)."""
+    value = value.strip().lower()
+    if value == 'all':
+        return None
+    match = re.fullmatch(r'(\d+)([dw])', value)
+    if not match:
+        raise ValueError(f"Parameter '{field_name}' must look like '90d', '12w' or 'all'")
+    days = int(match.group(1)) * (7 if match.group(2) == 'w' else 1)
+    return timedelta(days=days)
+
+def _feed_query(model, calendar_id, after, before):
+    """Booked rows of `model` (TimeSlot or ArchivedTimeSlot) for a feed window."""
+    query = db.select(
+        model.id,
+        db.literal(model is ArchivedTimeSlot).label('archived'),
+        model.name, model.start_time, model.end_time, model.location,
+    ).where(model.calendar_id == calendar_id, model.is_available == False)
+    if after is not None:
+        query = query.where(model.end_time > after)
+    if before is not None:
+        query = query.where(model.start_time < before)
+    return query
+
+def _ical_chunks(calendar, after, before, include_archived=False):
+    """
+    Yield the feed as bytes chunks of about _ICAL_CHUNK_BYTES.
+
+    Booked slots ending after `after` and starting before `before` (either may
+    be None) are read through a server-side cursor and rendered one VEVENT at
+    a time, so memory stays flat however long the history is. Archived
+    bookings are only included with include_archived.
+    """
+    import icalendar
 
     cal = icalendar.Calendar()
-    cal.add('prodid', '-//jbr46 Supervision Calendar//jbr46.user.srcf.net//')
+    cal.add('prodid', f'-//{calendar.display_name} Supervision Calendar//jbr46.user.srcf.net//')
     cal.add('version', '2.0')
-    cal.add('name', 'jbr46 Supervision Calendar')
-    cal.add('x-wr-calname', 'jbr46 Supervision Calendar')
-    cal.add('x-wr-caldesc', 'Supervision Calendar for jbr46')
+    cal.add('name', f'{calendar.display_name} Supervision Calendar')
+    cal.add('x-wr-calname', f'{calendar.display_name} Supervision Calendar')
+    cal.add('x-wr-caldesc', f'Supervision Calendar for {calendar.display_name}')
     cal.add('x-published-ttl', 'PT15M')  # Suggest updating every 15 minutes
-
-    # Only get the booked (not available) timeslots
-    timeslots = TimeSlot.query.filter_by(is_available=False).all()
-    app.logger.debug(f"Found {len(timeslots)} booked timeslots for calendar export")
-    for slot in timeslots:
+    footer = b"END:VCALENDAR\r\n"
+    header = cal.to_ical()
+    buffer = [header[:-len(footer)]]
+    buffered = len(buffer[0])
+
+    # Only get this calendar's booked (not available) timeslots
+    query = _feed_query(TimeSlot, calendar.calendar_id, after, before)
+    if include_archived:
+        query = db.union_all(_feed_query(ArchivedTimeSlot, calendar.calendar_id, after, before), query)
+    query = query.order_by(query.selected_columns.start_time)
+    rows = db.session.execute(query.execution_options(yield_per=500))
+    for slot in rows:
         event = icalendar.Event()
         event.add('summary', slot.name)
         event.add('dtstart', slot.start_time.replace(tzinfo=london_tz))
         event.add('dtend', slot.end_time.replace(tzinfo=london_tz))
         event.add('location', slot.location)
-        event['uid'] = f"{slot.id}@jbr46.user.srcf.net"  # Unique identifier for each event
-        cal.add_component(event)
-    
-    ical_data = cal.to_ical()
-    response = Response(ical_data)
+        # Unique identifier for each event; archive ids are a separate sequence.
+        event['uid'] = f"{'archived-' if slot.archived else ''}{slot.id}@jbr46.user.srcf.net"
+        chunk = event.to_ical()
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= _ICAL_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    buffer.append(footer)
+    yield b"".join(buffer)
+
+def _stream_calendar(calendar, after, before, include_archived, version):
+    """Stream the feed, then cache it if it turned out small enough."""
+    limit = int(os.getenv('ICAL_CACHE_MAX_BYTES', str(1024 * 1024)))
+    kept, kept_bytes = [], 0
+    for chunk in _ical_chunks(calendar, after, before, include_archived):
+        if kept is not None:
+            kept_bytes += len(chunk)
+            if kept_bytes <= limit:
+                kept.append(chunk)
+            else:
+                kept = None
+        yield chunk
+    # Without a revision row there is nothing to invalidate against.
+    if kept is not None and version[1] is not None:
+        cache_key = (calendar.calendar_id, after, before, include_archived)
+        body = b"".join(kept)
+        with _ical_cache_lock:
+            _ical_cache[cache_key] = (version, body)
+            _ical_cache.move_to_end(cache_key)
+            while len(_ical_cache) > _ICAL_CACHE_SIZE:
+                _ical_cache.popitem(last=False)
+
+@app.route('/api/export/<calendar_id>')
+def export_calendar(calendar_id):
+    """
+    iCal feed of a calendar's booked slots.
+
+    Query parameters (optional):
+      - past: how far back to include, e.g. '90d' or '12w', or 'all'
+        (default ICAL_EXPORT_PAST, '180d')
+      - future: how far ahead to include (default ICAL_EXPORT_FUTURE, 'all')
+      - archived: 'true' to also include bookings moved to the archive
+
+    Horizons are counted from the start of today (London time), so the feed
+    only changes at midnight or when slots are written.
+    """
+    app.logger.info("Exporting calendar for calendar_id: %s", calendar_id)
+    calendar = _calendar_info(calendar_id)
+    if calendar is None:
+        app.logger.warning("Calendar export failed: No admin found for calendar_id %s", calendar_id)
+        return "Calendar not found", 404
+
+    try:
+        past = _parse_horizon(request.args.get('past') or os.getenv('ICAL_EXPORT_PAST', '180d'), 'past')
+        future = _parse_horizon(request.args.get('future') or os.getenv('ICAL_EXPORT_FUTURE', 'all'), 'future')
+    except ValueError as e:
+        return str(e), 400
+    include_archived = request.args.get('archived', 'false').lower() == 'true'
+    today = datetime.now(london_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    after = (today - past).replace(tzinfo=None) if past is not None else None
+    before = (today + future).replace(tzinfo=None) if future is not None else None
+
+    revision, updated_at = _current_data_revision()
+    etag = hashlib.md5(
+        f"{calendar_id}:{revision}:{updated_at.isoformat() if updated_at else ''}:{after}:{before}:{include_archived}".encode()
+    ).hexdigest()
+    last_modified = updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+    if last_modified and (after is not None or before is not None):
+        # The window itself moves at midnight.
+        last_modified = max(last_modified, today.astimezone(timezone.utc))
+
+    headers = {
+        # Let clients store the feed but revalidate on every poll.
+        "Cache-Control": "no-cache",
+        "X-PUBLISHED-TTL": "PT15M",
+    }
+
+    # Only the ETag decides: Last-Modified has one-second resolution, so an
+    # If-Modified-Since-only client could miss a second write in the same second.
+    if not is_resource_modified(request.environ, etag=etag):
+        app.logger.info("Calendar not modified")
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        return response
+
+    cache_key = (calendar_id, after, before, include_archived)
+    with _ical_cache_lock:
+        cached = _ical_cache.get(cache_key)
+        if cached is not None and cached[0] == (revision, updated_at):
+            _ical_cache.move_to_end(cache_key)
+        else:
+            cached = None
+    if cached is not None:
+        response = Response(cached[1], headers=headers)
+    else:
+        response = Response(
+            stream_with_context(_stream_calendar(calendar, after, before, include_archived, (revision, updated_at))),
+            headers=headers,
+        )
     response.headers["Content-Type"] = "text/calendar; charset=utf-8"
     response.headers["Content-Disposition"] = "attachment; filename=calendar.ics"
-    
-    # Add headers to encourage subscription and frequent updates
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
-    response.headers["X-PUBLISHED-TTL"] = "PT15M"
-    
-    # Add ETag header for caching
-    etag = hashlib.md5(ical_data).hexdigest()
-    response.headers["ETag"] = etag
-    
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+
     app.logger.info("Calendar exported successfully")
     return response
 
 @app.route('/questions-set')
 def questions_set():
-    return render_template('questions-set.html')
+    return _cached_page('questions-set.html')
 
 @app.route('/faq')
 def faq():
-    return render_template('faq.html')
+    return _cached_page('faq.html')
+
+def _add_missing_column(table_name: str, column_name: str, column_type: str) -> bool:
+    """
+    create_all() never alters existing tables, so add new nullable columns by hand.
+
+    Returns True if the column was added.
+    """
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns(table_name)}
+    if column_name in columns:
+        return False
+    app.logger.warning("Adding %s.%s column", table_name, column_name)
+    with db.engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+    return True
+
+def _ensure_calendar_columns():
+    """Add the multi-supervisor columns to older databases."""
+    _add_missing_column('time_slot', 'calendar_id', 'VARCHAR(36)')
+    # Existing admins ran the single pre-tenancy calendar.
+    if _add_missing_column('admin', 'display_name', 'VARCHAR(100)'):
+        db.session.execute(update(Admin).values(display_name=DEFAULT_CALENDAR_OWNER))
+        db.session.commit()
+    if _add_missing_column('admin', 'email', 'VARCHAR(200)'):
+        db.session.execute(update(Admin).values(email=CONFIRMATION_EMAIL_RECIPIENT))
+        db.session.commit()
+
+def _assign_unowned_slots(admin):
+    """Give slots created before multi-supervisor support to the default calendar."""
+    assigned = db.session.execute(
+        update(TimeSlot)
+        .where(TimeSlot.calendar_id.is_(None))
+        .values(calendar_id=admin.calendar_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if assigned:
+        app.logger.warning("Assigned %s unowned slots to calendar %s", assigned, admin.calendar_id)
+
+def _ensure_series_ids():
+    """Add time_slot.series_id to older databases and group legacy repeats into series."""
+    _add_missing_column('time_slot', 'series_id', 'VARCHAR(36)')
+
+    legacy = (
+        TimeSlot.query.filter(TimeSlot.is_repeated == True, TimeSlot.series_id.is_(None))
+        .order_by(TimeSlot.start_time)
+        .all()
+    )
+    if not legacy:
+        return
+    # Same grouping the old weekday/time pattern match used: name, weekday,
+    # start time of day and end time of day.
+    series = {}
+    for slot in legacy:
+        key = (
+            slot.name,
+            slot.start_time.weekday(),
+            slot.start_time.time(),
+            slot.end_time.time(),
+        )
+        slot.series_id = series.setdefault(key, str(uuid.uuid4()))
+    db.session.commit()
+    app.logger.warning("Grouped %s legacy repeated slots into %s series", len(legacy), len(series))
 
 def init_db():
     with app.app_context():
         db.create_all()
-        ensure_admin_account()
+        _ensure_data_revision_row()
+        # Before any ORM query on time_slot or admin, which selects every mapped column.
+        _ensure_calendar_columns()
+        _add_missing_column('time_slot', 'split_from', 'INTEGER')
+        _ensure_series_ids()
+        _add_missing_column('slot_change', 'kind', 'VARCHAR(10)')
+        try:
+            with db.engine.begin() as conn:
+                _install_booked_overlap_guard(conn)
+        except SQLAlchemyError as e:
+            # Existing overlapping bookings block the constraint; keep serving.
+            app.logger.error("Could not install booked-slot overlap guard: %s", e)
+        # create_all() skips tables that already exist, so add any indexes
+        # introduced after the table was first created.
+        for index in TimeSlot.__table__.indexes | SlotChange.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+        _assign_unowned_slots(ensure_admin_account())
 
 # Configure logging
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request's endpoint when there is one."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+            'source': f"{record.module}:{record.lineno}",
+        }
+        for field in ('endpoint', 'method', 'path'):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _parse_log_sample_rates(value: str) -> dict:
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        endpoint, _, rate = item.partition('=')
+        rates[endpoint.strip()] = float(rate)
+    return rates
+
+class _RequestLogFilter(logging.Filter):
+    """
+    Tag records with the current request and sample hot read endpoints.
+
+    Below WARNING, records from an endpoint listed in LOG_SAMPLE_RATES are
+    kept for that fraction of requests; the choice is made once per request
+    so a sampled request keeps all of its lines. Dropped records are never
+    formatted.
+    """
+
+    def __init__(self, sample_rates: dict):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        record.endpoint = request.endpoint
+        record.method = request.method
+        record.path = request.path
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(request.endpoint)
+        if rate is None:
+            return True
+        if '_log_sampled' not in g:
+            g._log_sampled = random.random() < rate
+        return g._log_sampled
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() merges the message arguments and renders tracebacks
+    in the calling thread so records can cross process boundaries; ours only
+    go to a listener thread in the same process, so they are queued as is.
+    """
+
+    def prepare(self, record):
+        return record
+
+_log_listener = None
+
+def _restart_log_listener():
+    # The listener thread does not survive a fork (gunicorn --preload).
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener = QueueListener(_log_listener.queue, *_log_listener.handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 def configure_logging():
-    log_formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
+    """
+    Send app.logger records through a queue to the file and stdout handlers.
+
+    Request threads only enqueue records; a QueueListener thread does the
+    formatting and file I/O.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_formatter = _JsonFormatter()
     
     # Use an environment variable for the log file path, with a default for development
     log_file = os.getenv('FLASK_LOG_FILE', 'flask_app.log')
+    max_bytes = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    backup_count = int(os.getenv('LOG_BACKUP_COUNT', '10'))
     
-    file_handler = RotatingFileHandler(log_file, maxBytes=100240, backupCount=10)
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
     file_handler.setFormatter(log_formatter)
     file_handler.setLevel(logging.INFO)
     
@@ -895,16 +3362,106 @@ def configure_logging():
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setFormatter(log_formatter)
     stdout_handler.setLevel(logging.INFO)
-    
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(stdout_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(_RequestLogFilter(_parse_log_sample_rates(
+        os.getenv('LOG_SAMPLE_RATES', 'get_timeslots=0.05,get_timeslot_changes=0.05,export_calendar=0.05,health=0')
+    )))
+    _log_listener = QueueListener(log_queue, file_handler, stdout_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    os.register_at_fork(after_in_child=_restart_log_listener)
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
     app.logger.setLevel(logging.INFO)
     app.logger.info('Scheduler startup')
 
-# Call this function right after creating the Flask app
-configure_logging()
-init_db()
+_app_initialized = False
+_app_init_lock = threading.Lock()
+
+def create_app():
+    """
+    Finish setting up the app: logging, then the schema and admin bootstrap
+    if AUTO_INIT_DB=true. Deploys run ``flask --app app init-db`` instead, so
+    serving the app never issues DDL.
+
+    Safe to call more than once. Under ``gunicorn 'app:create_app()' --preload``
+    it runs once in the master and workers are forked ready to serve.
+    """
+    global _app_initialized
+    with _app_init_lock:
+        if not _app_initialized:
+            configure_logging()
+            if os.getenv('AUTO_INIT_DB', 'false').lower() == 'true':
+                init_db()
+                with app.app_context():
+                    # Forked workers must open their own connections.
+                    db.engine.dispose()
+            _app_initialized = True
+    return app
+
+@app.before_request
+def _create_app_on_first_request():
+    # `gunicorn app:app` and `flask run` never call create_app().
+    if not _app_initialized and not app.config.get('TESTING'):
+        create_app()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or upgrade the schema and bootstrap the admin account."""
+    init_db()
+    click.echo('Database initialized')
+
+@app.cli.command('create-supervisor')
+@click.argument('username')
+@click.option('--display-name', help='Name shown on the signup page and calendar feed.')
+@click.option('--email', help='Where signup confirmations for this calendar are sent.')
+@click.password_option()
+def create_supervisor_command(username, display_name, email, password):
+    """Add a supervisor with their own calendar."""
+    if Admin.query.filter_by(username=username).first():
+        raise click.ClickException(f"Supervisor '{username}' already exists")
+    supervisor = Admin(username=username, password=password, display_name=display_name, email=email)
+    db.session.add(supervisor)
+    db.session.commit()
+    click.echo(f"Created {username}; signup page: /c/{supervisor.calendar_id}")
+
+@app.cli.command('compact-slots')
+@click.option('--calendar', 'calendar_id', help='Only compact this calendar_id.')
+@click.option('--dry-run', is_flag=True, help='Report what would be merged without changing anything.')
+def compact_slots_command(calendar_id, dry_run):
+    """Merge touching available slots at the same location."""
+    try:
+        counts = compact_available_slots(calendar_id, dry_run=dry_run)
+    except CompactionConflict as e:
+        raise click.ClickException(f"{e}; run it again")
+    click.echo(
+        f"{'Would remove' if dry_run else 'Removed'} {counts['rows_removed']} rows "
+        f"({counts['slots_extended']} slots extended)"
+    )
+
+@app.cli.command('archive-slots')
+@click.option('--before', help='Archive slots that ended before this ISO date (default TERM_START).')
+@click.option('--calendar', 'calendar_id', help='Only archive this calendar_id.')
+@click.option('--batch-size', type=int, help='Rows per transaction (default ARCHIVE_BATCH_SIZE, 500).')
+@click.option('--dry-run', is_flag=True, help='Count the slots that would be archived.')
+def archive_slots_command(before, calendar_id, batch_size, dry_run):
+    """Move slots from past terms into the archive table."""
+    try:
+        cutoff = _parse_range_param(before, '--before') if before else _term_start()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if cutoff is None:
+        raise click.ClickException('Pass --before or set TERM_START')
+    counts = archive_slots(cutoff, calendar_id, batch_size, dry_run)
+    if dry_run:
+        click.echo(f"Would archive {counts['archived']} slots ending before {cutoff.isoformat()}")
+    else:
+        click.echo(f"Archived {counts['archived']} slots ending before {cutoff.isoformat()} in {counts['batches']} batches")
 
-# Call this function when you start your app
 if __name__ == '__main__':
-    app.run(host='127.0.0.1', port=5001, debug=True)
+    # Local development: create the schema on start unless told otherwise.
+    os.environ.setdefault('AUTO_INIT_DB', 'true')
+    create_app().run(host='127.0.0.1', port=5001, debug=True)
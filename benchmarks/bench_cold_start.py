@@ -0,0 +1,72 @@
+"""
+Measure how long a fresh process takes to import the app and initialize it.
+
+Each run starts a new interpreter against an already-initialized SQLite
+database and reports three times: Python startup plus everything below
+(process), ``import app`` alone (import), and ``create_app()`` when the tree
+has one (init). With ``gunicorn app:app`` every worker pays the import; with
+``gunicorn --preload 'app:create_app()'`` the master pays import and init
+once and workers are forked ready to serve.
+
+    python benchmarks/bench_cold_start.py [--runs 15] [--tree PATH]
+
+--tree points at another checkout (e.g. a ``git worktree`` of an older
+commit) to compare before and after.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+if hasattr(app, 'create_app'):
+    app.create_app()
+print(json.dumps({'import': imported - started, 'init': time.perf_counter() - imported}))
+"""
+
+
+def _run_once(tree, env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, str(tree)], cwd=tree, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--tree", type=Path, default=Path(__file__).resolve().parents[1])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="scheduler-cold-start-")
+    env = {
+        **os.environ,
+        "SECRET_KEY": "bench-secret",
+        "ADMIN_PASSWORD": "bench-admin-password",
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.sqlite",
+        "FLASK_LOG_FILE": os.path.join(workdir, "bench.log"),
+    }
+    _run_once(args.tree, env)  # create the schema and admin so every timed run is a warm restart
+
+    samples = [_run_once(args.tree, env) for _ in range(args.runs)]
+    print(f"{args.tree} ({args.runs} runs)")
+    for phase in ("process", "import", "init"):
+        values = [sample[phase] * 1000 for sample in samples]
+        print(f"  {phase:<8} p50 {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
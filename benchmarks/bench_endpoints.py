@@ -0,0 +1,346 @@
+"""
+Benchmark the scheduler's hot endpoints at term, year and five-year scale.
+
+Each scale seeds a fresh database with weekday timetables: a repeating
+booked series, single bookings, and available slots, some of them split
+into fragments the way book_supervision leaves them. It then times requests
+through the Flask test client and writes the results as JSON.
+
+    python benchmarks/bench_endpoints.py run --output results.json
+    python benchmarks/bench_endpoints.py run --scales term --runs 5
+    python benchmarks/bench_endpoints.py compare base.json results.json --threshold 0.2
+
+compare exits with status 1 if any case's p50 got slower by more than the
+threshold (as a fraction), ignoring differences under --min-delta-ms.
+
+By default each scale uses a throwaway SQLite file. Set BENCH_DATABASE_URL
+to benchmark against another database; it is dropped and recreated.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Weeks of history per scale; every scale also gets TERM_WEEKS future weeks
+# that the write benchmarks book into.
+SCALES = {"term": 8, "year": 52, "five_years": 260}
+TERM_WEEKS = 8
+FIRST_MONDAY = datetime(2021, 1, 4)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(samples):
+    return {
+        "runs": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def _day_rows(day, term_index, weekday):
+    """One weekday's timetable. Booked rows never overlap each other."""
+    at = lambda hour, minute=0: day.replace(hour=hour, minute=minute)
+    series_id = f"series-{term_index}-{weekday}"
+    return [
+        dict(start_time=at(9), end_time=at(10), is_available=False, name=f"series {term_index} {weekday}",
+             location="Room A", is_repeated=True, series_id=series_id),
+        dict(start_time=at(10), end_time=at(11), is_available=True, location="Room A"),
+        # Fragments left behind by earlier book_supervision splits.
+        dict(start_time=at(11), end_time=at(11, 30), is_available=True, location="Room A"),
+        dict(start_time=at(11, 30), end_time=at(12), is_available=True, location="Room A"),
+        dict(start_time=at(12), end_time=at(12, 15), is_available=True, location="Room A"),
+        dict(start_time=at(13), end_time=at(14), is_available=False, name="single", location="Room B"),
+        dict(start_time=at(14), end_time=at(16), is_available=True, location="Room B"),
+        dict(start_time=at(16), end_time=at(17), is_available=True, location="Room B"),
+    ]
+
+
+def _seed(app_module, history_weeks):
+    db, TimeSlot = app_module.db, app_module.TimeSlot
+    db.drop_all()
+    db.create_all()
+    calendar_id = app_module.ensure_admin_account().calendar_id
+    rows = []
+    for week in range(history_weeks + TERM_WEEKS):
+        monday = FIRST_MONDAY + timedelta(weeks=week)
+        for weekday in range(5):
+            rows.extend(_day_rows(monday + timedelta(days=weekday), week // TERM_WEEKS, weekday))
+    for row in rows:
+        row.setdefault("name", None)
+        row.setdefault("is_repeated", False)
+        row.setdefault("series_id", None)
+        row["calendar_id"] = calendar_id
+    db.session.execute(TimeSlot.__table__.insert(), rows)
+    db.session.commit()
+    app_module._ensure_data_revision_row()
+    return len(rows)
+
+
+def _time(fn, runs, setup=None):
+    samples = []
+    for index in range(runs):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        response = fn(index)
+        samples.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return samples
+
+
+def _read_body(response):
+    """Consume a (possibly streamed) body and close it, releasing its request context."""
+    response.get_data()
+    response.close()
+    return response
+
+
+def _slot_ids(app_module, **filters):
+    TimeSlot = app_module.TimeSlot
+    query = TimeSlot.query
+    for column, condition in filters.items():
+        query = query.filter(condition(getattr(TimeSlot, column)))
+    return [slot.id for slot in query.order_by(TimeSlot.start_time).all()]
+
+
+def _bench_scale(app_module, history_weeks, runs):
+    app, db, TimeSlot = app_module.app, app_module.db, app_module.TimeSlot
+    client = app.test_client()
+    base = {"base_url": "https://localhost"}
+    admin = {"Authorization": f"Bearer {os.environ['ADMIN_API_TOKEN']}"}
+    future_start = FIRST_MONDAY + timedelta(weeks=history_weeks)
+    future_end = future_start + timedelta(weeks=TERM_WEEKS)
+    results = {}
+
+    rows = _seed(app_module, history_weeks)
+    calendar_id = app_module.ensure_admin_account().calendar_id
+    week = {"start": future_start.isoformat(), "end": (future_start + timedelta(weeks=1)).isoformat()}
+
+    # Reads: cold means this worker's response caches are empty.
+    clear_timeslots = app_module._timeslots_cache.clear
+    clear_ical = app_module._ical_cache.clear
+    results["get_timeslots_week_cold"] = _time(
+        lambda i: client.get("/api/get_timeslots", query_string=week, **base), runs, clear_timeslots)
+    results["get_timeslots_week_warm"] = _time(
+        lambda i: client.get("/api/get_timeslots", query_string=week, **base), runs)
+    results["get_timeslots_all_cold"] = _time(
+        lambda i: client.get("/api/get_timeslots", **base), runs, clear_timeslots)
+    # The export streams: read the whole body inside the timing.
+    results["export_calendar_cold"] = _time(
+        lambda i: _read_body(client.get(f"/api/export/{calendar_id}", **base)), runs, clear_ical)
+    etag = _read_body(client.get(f"/api/export/{calendar_id}", **base)).headers["ETag"]
+    results["export_calendar_not_modified"] = _time(
+        lambda i: _read_body(client.get(f"/api/export/{calendar_id}", headers={"If-None-Match": etag}, **base)),
+        runs)
+
+    results["availability_search_60m"] = _time(
+        lambda i: client.get(
+            "/api/availability/search",
+            query_string={"duration": "60m", "from": future_start.isoformat(), "to": future_end.isoformat()},
+            **base),
+        runs)
+
+    # Admin saves: the legacy whole-calendar snapshot and a 50-slot change set.
+    snapshot = [
+        {
+            "id": str(slot.id),
+            "start_time": slot.start_time.isoformat(),
+            "end_time": slot.end_time.isoformat(),
+            "is_available": slot.is_available,
+            "location": slot.location,
+            "name": slot.name,
+        }
+        for slot in TimeSlot.query.filter(TimeSlot.start_time >= future_start - timedelta(weeks=TERM_WEEKS))
+        .order_by(TimeSlot.start_time)
+    ]
+    results[f"set_timeslots_snapshot_{2 * TERM_WEEKS}w"] = _time(
+        lambda i: client.post("/api/admin/set_timeslots", json=snapshot, headers=admin, **base), runs)
+    change_set = {"updated": [slot for slot in snapshot if slot["is_available"]][:50]}
+    results["set_timeslots_changeset_50"] = _time(
+        lambda i: client.post("/api/admin/set_timeslots", json=change_set, headers=admin, **base), runs)
+
+    # Writes, each run against a different future slot.
+    signup_ids = _slot_ids(
+        app_module, start_time=lambda c: c >= future_start, location=lambda c: c == "Room B",
+        end_time=lambda c: c.isnot(None))
+    signup_ids = [
+        slot_id for slot_id in signup_ids
+        if db.session.get(TimeSlot, slot_id).start_time.hour == 16
+    ][:runs]
+    results["signup_single"] = _time(
+        lambda i: client.post("/api/signup", json={"id": signup_ids[i], "name": "bench", "repeat": False}, **base),
+        len(signup_ids))
+
+    os.environ["END_OF_TERM"] = future_end.date().isoformat()
+    repeat_ids = [
+        slot_id for slot_id in _slot_ids(app_module, start_time=lambda c: c >= future_start)
+        if db.session.get(TimeSlot, slot_id).start_time.hour == 10
+    ][:5]  # one per weekday; later weeks are taken by the series
+    results["signup_repeat_term"] = _time(
+        lambda i: client.post("/api/signup", json={"id": repeat_ids[i], "name": "bench", "repeat": True}, **base),
+        min(runs, len(repeat_ids)))
+
+    split_targets = [
+        db.session.get(TimeSlot, slot_id)
+        for slot_id in _slot_ids(app_module, start_time=lambda c: c >= future_start, location=lambda c: c == "Room B")
+    ]
+    split_targets = [slot for slot in split_targets if slot.start_time.hour == 14 and slot.is_available]
+    # The term-start script's shape: the remaining targets booked in one batch per run.
+    batches = [
+        [
+            {
+                "start_time": slot.start_time.isoformat(),
+                "end_time": (slot.start_time + timedelta(hours=1)).isoformat(),
+                "students": ["bench"],
+            }
+            for slot in split_targets[runs + index::runs]
+        ]
+        for index in range(runs)
+    ]
+    split_targets = split_targets[:runs]
+    split_payloads = [
+        {
+            "start_time": (slot.start_time + timedelta(minutes=30)).isoformat(),
+            "end_time": (slot.start_time + timedelta(minutes=90)).isoformat(),
+            "students": ["bench"],
+        }
+        for slot in split_targets
+    ]
+    results["book_supervision_split"] = _time(
+        lambda i: client.post("/api/admin/book_supervision", json=split_payloads[i], headers=admin, **base),
+        len(split_payloads))
+    batches = [batch for batch in batches if batch]
+    results["book_supervision_batch"] = _time(
+        lambda i: client.post(
+            "/api/admin/book_supervision/batch", json={"bookings": batches[i]}, headers=admin, **base),
+        len(batches))
+
+    series_heads = []
+    for term_index in range(history_weeks // TERM_WEEKS):
+        for weekday in range(5):
+            first = (
+                TimeSlot.query.filter_by(series_id=f"series-{term_index}-{weekday}")
+                .order_by(TimeSlot.start_time).first()
+            )
+            if first is not None:
+                series_heads.append(first.id)
+    series_heads = series_heads[:runs]
+    results["delete_timeslot_series"] = _time(
+        lambda i: client.delete(
+            f"/api/admin/delete_timeslot/{series_heads[i]}?delete_subsequent=true", headers=admin, **base),
+        len(series_heads))
+
+    return rows, {case: _summarize(samples) for case, samples in results.items() if samples}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="scheduler-bench-")
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+    os.environ.setdefault("ADMIN_API_TOKEN", "bench-admin-token")
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{workdir}/bench.sqlite")
+    os.environ["FLASK_LOG_FILE"] = os.path.join(workdir, "bench.log")
+    sys.path.insert(0, str(ROOT))
+    import app as app_module
+
+    app_module.app.config["TESTING"] = True
+    app_module.app.logger.setLevel(logging.WARNING)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "runs": args.runs,
+        },
+        "results": {},
+    }
+    for scale in args.scales:
+        with app_module.app.app_context():
+            rows, cases = _bench_scale(app_module, SCALES[scale], args.runs)
+        report["results"][scale] = {"rows": rows, "cases": cases}
+        print(f"\n{scale} ({rows} rows)")
+        print(f"  {'case':<34} {'p50 ms':>9} {'p95 ms':>9} {'runs':>5}")
+        for case, summary in cases.items():
+            print(f"  {case:<34} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['runs']:>5}")
+
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nWrote {args.output}")
+
+
+def compare(args):
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    regressions = 0
+    print(f"{'scale':<11} {'case':<34} {'base':>9} {'new':>9} {'change':>8}")
+    for scale, scale_results in new["results"].items():
+        base_cases = base["results"].get(scale, {}).get("cases", {})
+        for case, summary in scale_results["cases"].items():
+            if case not in base_cases:
+                continue
+            before, after = base_cases[case]["p50_ms"], summary["p50_ms"]
+            change = (after - before) / before if before else 0.0
+            regressed = change > args.threshold and after - before > args.min_delta_ms
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{scale:<11} {case:<34} {before:>9.2f} {after:>9.2f} {change:>+8.0%}{flag}")
+    if regressions:
+        print(f"\n{regressions} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed and time every case")
+    run_parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    run_parser.add_argument("--runs", type=int, default=20, help="samples per case (write cases may use fewer)")
+    run_parser.add_argument("--output", default="bench-results.json")
+
+    compare_parser = commands.add_parser("compare", help="flag p50 regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore smaller absolute changes")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Measure how long a repeating /api/signup holds the write transaction.
+
+Lock-hold time is measured from the first write statement (the atomic
+is_available UPDATE, which takes SQLite's write lock) to the COMMIT.
+
+    python benchmarks/bench_repeat_signup.py [--history 5000] [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp(prefix="scheduler-bench-")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin-password")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.sqlite"
+os.environ["FLASK_LOG_FILE"] = os.path.join(_tmpdir, "bench.log")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import logging
+
+from sqlalchemy import event
+
+from app import app, db, TimeSlot
+
+TERM_START = datetime(2026, 1, 5, 9)
+
+
+def _seed(history):
+    db.drop_all()
+    db.create_all()
+    # Unrelated booked history before the term, one slot per weekday hour.
+    db.session.add_all(
+        TimeSlot(
+            start_time=TERM_START - timedelta(hours=i + 1),
+            end_time=TERM_START - timedelta(hours=i),
+            is_available=False,
+            name="history",
+            location="A",
+        )
+        for i in range(history)
+    )
+    db.session.commit()
+
+
+class LockTimer:
+    def __init__(self, engine):
+        self.started = None
+        self.samples = []
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "commit", self._commit)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.started is None and statement.lstrip().upper().startswith(("UPDATE", "INSERT", "DELETE")):
+            self.started = time.perf_counter()
+
+    def _commit(self, conn):
+        if self.started is not None:
+            self.samples.append(time.perf_counter() - self.started)
+            self.started = None
+
+
+def run(weeks, history, runs):
+    client = app.test_client()
+    with app.app_context():
+        timer = LockTimer(db.engine)
+        for run_index in range(runs):
+            _seed(history)
+            slot = TimeSlot(
+                start_time=TERM_START,
+                end_time=TERM_START + timedelta(hours=1),
+                is_available=True,
+                location="A",
+            )
+            db.session.add(slot)
+            db.session.commit()
+            slot_id = slot.id
+            os.environ["END_OF_TERM"] = (TERM_START + timedelta(weeks=weeks)).date().isoformat()
+            timer.samples.clear()
+            response = client.post(
+                "/api/signup",
+                json={"id": slot_id, "name": "bench", "repeat": True},
+                base_url="https://localhost",
+            )
+            assert response.status_code == 200, response.json
+            hold = timer.samples[-1]
+            yield hold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, default=5000, help="unrelated booked rows to seed")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app.config["TESTING"] = True
+    app.logger.setLevel(logging.WARNING)
+    print(f"{'weeks':>6} {'p50 ms':>9} {'p90 ms':>9} {'max ms':>9}")
+    for weeks in (8, 52):
+        samples = sorted(run(weeks, args.history, args.runs))
+        p50 = statistics.median(samples) * 1000
+        p90 = samples[int(len(samples) * 0.9) - 1] * 1000
+        print(f"{weeks:>6} {p50:>9.2f} {p90:>9.2f} {samples[-1] * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Load-test concurrent signups against gunicorn and check for double booking.
+
+Seeds a file-backed SQLite database with a few weeks of hourly available
+slots, starts the app under gunicorn, then fires a shuffled mix of
+contended requests from a thread pool:
+
+  - several single signups racing for each slot,
+  - repeat signups whose weekly occurrences land on other contended slots,
+  - book_supervision calls straddling two neighbouring slots.
+
+It reports throughput, p50/p99 latency per request kind, status counts and
+"database is locked" errors from the server log, then checks the final
+table. It exits with status 1 if any booked slots overlap or a slot was
+signed up for by more than one single signup.
+
+    python benchmarks/load_signup.py [--workers 4] [--concurrency 32] [--slots 60] [--admission off]
+
+Each signup comes from its own client address (via X-Forwarded-For), the
+way a cohort does, so admission control limits them globally rather than
+as one client.
+
+gunicorn must be installed.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+WEEKS = 3
+ADMIN_TOKEN = "load-admin-token"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _seed(env, slots_per_week):
+    """Create the schema through the app, then insert hourly available slots."""
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "app", "init-db"], cwd=ROOT, env=env, check=True, capture_output=True
+    )
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    first = datetime.combine(monday, datetime.min.time())
+    rows = []
+    for week in range(WEEKS):
+        for index in range(slots_per_week):
+            day, hour = divmod(index, 8)
+            start = first + timedelta(weeks=week, days=day % 5, hours=9 + hour)
+            rows.append((start, start + timedelta(hours=1)))
+    with sqlite3.connect(env["DATABASE_URL"].removeprefix("sqlite:///")) as conn:
+        (calendar_id,) = conn.execute("SELECT calendar_id FROM admin ORDER BY id LIMIT 1").fetchone()
+        conn.executemany(
+            "INSERT INTO time_slot (start_time, end_time, is_available, location, is_repeated, calendar_id) "
+            "VALUES (?, ?, 1, 'Room A', 0, ?)",
+            [(start.isoformat(" "), end.isoformat(" "), calendar_id) for start, end in rows],
+        )
+        ids = [row[0] for row in conn.execute("SELECT id FROM time_slot ORDER BY start_time")]
+    return first + timedelta(weeks=WEEKS), list(zip(ids, rows))
+
+
+def _wait_for_server(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            _request(base_url, "GET", "/api/health")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def _request(base_url, method, path, body=None, headers=None):
+    # gunicorn trusts X-Forwarded-Proto from localhost, which satisfies the HTTPS redirect.
+    request = urllib.request.Request(
+        base_url + path,
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json", "X-Forwarded-Proto": "https", **(headers or {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _build_requests(slots, signups_per_slot, repeat_fraction, rng):
+    requests = []
+    for slot_id, (start, end) in slots:
+        for attempt in range(signups_per_slot):
+            repeat = rng.random() < repeat_fraction
+            requests.append((
+                "signup_repeat" if repeat else "signup",
+                slot_id,
+                "POST",
+                "/api/signup",
+                {"id": slot_id, "name": f"student {slot_id}-{attempt}", "repeat": repeat},
+                {"X-Forwarded-For": f"10.{attempt}.{slot_id // 256 % 256}.{slot_id % 256}"},
+            ))
+        # Straddles this slot and the next hour, racing signups on both.
+        requests.append((
+            "book_supervision",
+            slot_id,
+            "POST",
+            "/api/admin/book_supervision",
+            {
+                "start_time": (start + timedelta(minutes=30)).isoformat(),
+                "end_time": (end + timedelta(minutes=30)).isoformat(),
+                "students": [f"supervision {slot_id}"],
+            },
+            {"Authorization": f"Bearer {ADMIN_TOKEN}"},
+        ))
+    rng.shuffle(requests)
+    return requests
+
+
+def _booked_overlaps(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT a.id, b.id, a.start_time, a.end_time, b.start_time, b.end_time "
+            "FROM time_slot a JOIN time_slot b ON a.id < b.id "
+            "WHERE a.is_available = 0 AND b.is_available = 0 AND a.calendar_id IS b.calendar_id "
+            "AND a.start_time < b.end_time AND b.start_time < a.end_time"
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="client threads")
+    parser.add_argument("--slots", type=int, default=40, help="contended slots per week")
+    parser.add_argument("--signups-per-slot", type=int, default=4)
+    parser.add_argument("--repeat-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--admission", choices=("on", "off"), default="on", help="ADMISSION_CONTROL for the server")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="scheduler-load-")
+    db_path = os.path.join(workdir, "load.sqlite")
+    log_path = os.path.join(workdir, "server.log")
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "SECRET_KEY": "load-secret",
+        "ADMIN_PASSWORD": "load-admin-password",
+        "ADMIN_API_TOKEN": ADMIN_TOKEN,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "FLASK_LOG_FILE": log_path,
+        "EMAIL_OUTBOX_WORKER": "off",
+        "ADMISSION_CONTROL": args.admission,
+        "ADMISSION_STATE_FILE": os.path.join(workdir, "admission.bin"),
+    }
+    end_of_term, slots = _seed(env, args.slots)
+    env["END_OF_TERM"] = end_of_term.date().isoformat()
+    requests = _build_requests(slots, args.signups_per_slot, args.repeat_fraction, random.Random(args.seed))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(args.workers), "--bind", f"127.0.0.1:{port}",
+         "--log-level", "warning", "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+    )
+
+    def fire(item):
+        kind, slot_id, method, path, body, headers = item
+        started = time.perf_counter()
+        try:
+            status, _ = _request(base_url, method, path, body, headers)
+        except OSError:
+            status = "connection error"
+        return kind, slot_id, status, time.perf_counter() - started
+
+    try:
+        _wait_for_server(base_url, server)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(fire, requests))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    single_successes = Counter()
+    for kind, slot_id, status, seconds in results:
+        latencies[kind].append(seconds)
+        latencies["all"].append(seconds)
+        statuses[kind][status] += 1
+        if kind == "signup" and status == 200:
+            single_successes[slot_id] += 1
+    locked = Path(log_path).read_text().count("database is locked") if os.path.exists(log_path) else 0
+
+    print(f"{len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s), "
+          f"{args.workers} workers, {args.concurrency} client threads")
+    print(f"  {'kind':<18} {'count':>6} {'p50 ms':>9} {'p99 ms':>9}  statuses")
+    for kind in ("signup", "signup_repeat", "book_supervision", "all"):
+        samples = latencies.get(kind)
+        if not samples:
+            continue
+        status_text = ", ".join(f"{status}: {count}" for status, count in sorted(statuses[kind].items(), key=str))
+        print(f"  {kind:<18} {len(samples):>6} {statistics.median(samples) * 1000:>9.1f} "
+              f"{_percentile(samples, 0.99) * 1000:>9.1f}  {status_text}")
+    print(f"  'database is locked' errors in server log: {locked}")
+
+    overlaps = _booked_overlaps(db_path)
+    doubles = {slot_id: count for slot_id, count in single_successes.items() if count > 1}
+    for overlap in overlaps[:10]:
+        print(f"  OVERLAP booked slots {overlap[0]} {overlap[2]}-{overlap[3]} and {overlap[1]} {overlap[4]}-{overlap[5]}")
+    for slot_id, count in list(doubles.items())[:10]:
+        print(f"  DOUBLE BOOKING slot {slot_id} accepted {count} single signups")
+    if overlaps or doubles:
+        print(f"FAILED: {len(overlaps)} overlapping booked pairs, {len(doubles)} double-booked slots")
+        return 1
+    print("OK: no overlapping booked slots")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,5 +7,9 @@ set -euo pipefail
 git pull origin main
 source .venv/bin/activate
 pip install -r requirements.txt
+# Downscaled/WebP footer images; skipped (originals served) without Pillow.
+python scripts/build_image_variants.py
+# Schema changes run here, never in the web workers (AUTO_INIT_DB defaults to false).
+flask --app app init-db
 systemctl --user restart scheduler
 
@@ -0,0 +1,53 @@
+"""
+Write downscaled PNG and WebP copies of the page images into static/variants/.
+
+The footer images are 1920px wide but shown at 80px, and the favicon is
+512px; the pages link these variants (via static_image/static_variant)
+when they exist and the originals otherwise.
+
+    python scripts/build_image_variants.py [--force]
+
+Needs Pillow, which is only used at build time. Without it the script says
+so and exits 0, and the pages keep serving the originals.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+STATIC = Path(__file__).resolve().parents[1] / "static"
+# Source image and the widths it is displayed at, doubled for high-DPI screens.
+VARIANTS = {
+    "mirex.png": 160,
+    "artemisinin.png": 160,
+    "erlenmeyer-flask.png": 64,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="Rebuild variants that are already up to date.")
+    args = parser.parse_args()
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Pillow is not installed; skipping image variants (pip install Pillow to build them)")
+        return 0
+
+    out_dir = STATIC / "variants"
+    out_dir.mkdir(exist_ok=True)
+    for filename, width in VARIANTS.items():
+        source = STATIC / filename
+        with Image.open(source) as image:
+            height = round(image.height * width / image.width)
+            resized = image.convert("RGBA").resize((width, height), Image.LANCZOS)
+        for fmt, options in (("png", {"optimize": True}), ("webp", {"quality": 85, "method": 6})):
+            target = out_dir / f"{source.stem}-{width}.{fmt}"
+            if target.exists() and target.stat().st_mtime >= source.stat().st_mtime and not args.force:
+                continue
+            resized.save(target, fmt.upper(), **options)
+            print(f"{target.relative_to(STATIC)}: {source.stat().st_size} -> {target.stat().st_size} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "test-admin-password")
+os.environ.setdefault("ADMIN_API_TOKEN", "test-admin-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/scheduler-test.sqlite")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from app import app, db
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def no_confirmation_emails(monkeypatch):
+    """Skip queueing signup confirmations; test_email_outbox overrides this."""
+    monkeypatch.setattr("app.send_confirmation_email", lambda *args, **kwargs: True)
+
+
+@pytest.fixture
+def admin_headers():
+    return {"Authorization": "Bearer test-admin-token"}
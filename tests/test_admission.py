@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from app import app, _AdmissionBuckets, _FairQueue, _parse_bucket
+
+
+@pytest.fixture(autouse=True)
+def fresh_admission_state(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADMISSION_STATE_FILE", str(tmp_path / "admission.bin"))
+    monkeypatch.setattr(app_module, "_admission_buckets", _AdmissionBuckets())
+
+
+def test_parse_bucket():
+    assert _parse_bucket("2/s:20", "X") == (2.0, 20)
+    assert _parse_bucket("30/m:5", "X") == (0.5, 5)
+    with pytest.raises(RuntimeError):
+        _parse_bucket("lots", "X")
+
+
+def test_clients_over_their_budget_get_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(app_module, "_admission_enabled", lambda: True)
+    monkeypatch.setenv("ADMISSION_CLIENT_READS", "1/m:2")
+    client = app.test_client()
+
+    statuses = [client.get("/api/get_timeslots", base_url="https://localhost").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    limited = client.get("/api/get_timeslots", base_url="https://localhost")
+    assert 1 <= int(limited.headers["Retry-After"]) <= 60
+
+    other = client.get(
+        "/api/get_timeslots", headers={"X-Forwarded-For": "203.0.113.9"}, base_url="https://localhost"
+    )
+    assert other.status_code == 200
+    admin = client.get(
+        "/api/get_timeslots", headers={"Authorization": "Bearer test-admin-token"}, base_url="https://localhost"
+    )
+    assert admin.status_code == 200
+
+
+def test_buckets_are_shared_through_the_state_file(monkeypatch):
+    monkeypatch.setenv("ADMISSION_GLOBAL_SIGNUPS", "1/h:3")
+    with app.app_context():
+        first_worker, second_worker = _AdmissionBuckets(), _AdmissionBuckets()
+        assert first_worker.take("signups", "a") == 0
+        assert second_worker.take("signups", "b") == 0
+        assert first_worker.take("signups", "c") == 0
+        assert second_worker.take("signups", "d") > 0
+
+
+def test_fair_queue_serves_clients_round_robin():
+    queue = _FairQueue(limit=1, max_waiting=3)
+    assert queue.acquire("holder", timeout=1)
+    order = []
+
+    def wait(client):
+        if queue.acquire(client, timeout=5):
+            order.append(client)
+            queue.release()
+
+    threads = []
+    for client in ("a", "a", "b"):
+        threads.append(threading.Thread(target=wait, args=(client,)))
+        threads[-1].start()
+        while len(queue._waiting) < len(threads):
+            time.sleep(0.001)
+    assert not queue.acquire("c", timeout=1)  # full
+
+    queue.release()
+    for thread in threads:
+        thread.join()
+    assert order == ["a", "b", "a"]
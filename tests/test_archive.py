@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, update
+
+import app as app_module
+from app import app, db, ArchivedTimeSlot, SlotChange, TimeSlot, archive_slots, ensure_admin_account
+
+
+@pytest.fixture(autouse=True)
+def no_term_or_cached_feeds(monkeypatch):
+    monkeypatch.delenv("TERM_START", raising=False)
+    app_module._ical_cache.clear()
+
+
+def _seed():
+    """Two slots from last term (one booked) and one booking this term."""
+    with app.app_context():
+        calendar_id = ensure_admin_account().calendar_id
+        slots = [
+            TimeSlot(start_time=datetime(2025, 11, 3, 9), end_time=datetime(2025, 11, 3, 10),
+                     is_available=False, name="old student", location="A", calendar_id=calendar_id),
+            TimeSlot(start_time=datetime(2025, 11, 4, 9), end_time=datetime(2025, 11, 4, 10),
+                     is_available=True, location="A", calendar_id=calendar_id),
+            TimeSlot(start_time=datetime(2026, 1, 20, 9), end_time=datetime(2026, 1, 20, 10),
+                     is_available=False, name="new student", location="A", calendar_id=calendar_id),
+        ]
+        db.session.add_all(slots)
+        db.session.commit()
+        return calendar_id, [slot.id for slot in slots]
+
+
+def test_archive_moves_past_slots_in_batches():
+    calendar_id, (old_id, free_id, new_id) = _seed()
+    with app.app_context():
+        counts = archive_slots(datetime(2026, 1, 1), batch_size=1)
+
+        assert counts == {"archived": 2, "batches": 2}
+        assert [slot.id for slot in TimeSlot.query] == [new_id]
+        archived = ArchivedTimeSlot.query.order_by(ArchivedTimeSlot.start_time).all()
+        assert [(slot.slot_id, slot.name, slot.calendar_id) for slot in archived] == [
+            (old_id, "old student", calendar_id),
+            (free_id, None, calendar_id),
+        ]
+        assert {(change.slot_id, change.kind) for change in SlotChange.query} == {
+            (old_id, "archived"), (free_id, "archived")
+        }
+
+
+
+def test_slot_moved_into_the_term_meanwhile_is_not_archived():
+    calendar_id, (old_id, free_id, new_id) = _seed()
+    with app.app_context():
+
+        def move_before_delete(state):
+            if state.is_delete and not moved:
+                moved.append(free_id)
+                with db.engine.begin() as connection:  # an admin edit committing concurrently
+                    connection.execute(
+                        update(TimeSlot).where(TimeSlot.id == free_id)
+                        .values(start_time=datetime(2026, 1, 21, 9), end_time=datetime(2026, 1, 21, 10))
+                    )
+
+        moved = []
+        event.listen(db.session, "do_orm_execute", move_before_delete)
+        try:
+            counts = archive_slots(datetime(2026, 1, 1))
+        finally:
+            event.remove(db.session, "do_orm_execute", move_before_delete)
+
+        assert counts["archived"] == 1
+        assert [slot.slot_id for slot in ArchivedTimeSlot.query] == [old_id]
+        assert sorted(slot.id for slot in TimeSlot.query) == [free_id, new_id]
+
+
+def test_export_includes_archived_bookings_only_on_request():
+    calendar_id, (old_id, _, _) = _seed()
+    with app.app_context():
+        archive_slots(datetime(2026, 1, 1))
+    client = app.test_client()
+
+    default = client.get(f"/api/export/{calendar_id}?past=all", base_url="https://localhost").data
+    assert b"new student" in default
+    assert b"old student" not in default
+
+    full = client.get(f"/api/export/{calendar_id}?past=all&archived=true", base_url="https://localhost").data
+    assert full.index(b"old student") < full.index(b"new student")
+    assert b"UID:archived-1@" in full
+    assert f"UID:{old_id}@".encode() not in full
+
+
+def test_archived_uids_never_clash_with_reused_slot_ids():
+    calendar_id, _ = _seed()
+    with app.app_context():
+        archive_slots(datetime(2026, 2, 1))
+        # SQLite hands the archived ids out again.
+        reused = TimeSlot(start_time=datetime(2026, 2, 2, 9), end_time=datetime(2026, 2, 2, 10),
+                          is_available=False, name="later student", location="A", calendar_id=calendar_id)
+        db.session.add(reused)
+        db.session.commit()
+        assert ArchivedTimeSlot.query.filter_by(slot_id=reused.id).count() == 1
+
+    feed = app.test_client().get(
+        f"/api/export/{calendar_id}?past=all&archived=true", base_url="https://localhost"
+    ).get_data(as_text=True)
+    uids = [line for line in feed.splitlines() if line.startswith("UID:")]
+    assert len(uids) == 3 == len(set(uids))
+
+
+def test_get_timeslots_defaults_to_the_current_term(monkeypatch):
+    _seed()
+    monkeypatch.setenv("TERM_START", "2026-01-11")
+    client = app.test_client()
+
+    current = client.get("/api/get_timeslots", base_url="https://localhost").get_json()
+    assert [slot["name"] for slot in current] == ["new student"]
+    everything = client.get("/api/get_timeslots?start=2025-01-01", base_url="https://localhost").get_json()
+    assert len(everything) == 3
+
+
+def test_archive_slots_command_needs_a_cutoff(monkeypatch):
+    _seed()
+    runner = app.test_cli_runner()
+
+    assert runner.invoke(args=["archive-slots"]).exit_code != 0
+    monkeypatch.setenv("TERM_START", "2026-01-11")
+    result = runner.invoke(args=["archive-slots", "--dry-run"])
+    assert "Would archive 2 slots" in result.output
+    result = runner.invoke(args=["archive-slots"])
+    assert "Archived 2 slots" in result.output
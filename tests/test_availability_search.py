@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from app import app, db, TimeSlot
+
+
+def _slot(start, end, available=True, location="A", day=2):
+    hour, minute = divmod(start, 100)
+    end_hour, end_minute = divmod(end, 100)
+    return TimeSlot(
+        start_time=datetime(2026, 2, day, hour, minute),
+        end_time=datetime(2026, 2, day, end_hour, end_minute),
+        is_available=available,
+        name=None if available else "booked",
+        location=location,
+    )
+
+
+def _search(**params):
+    params = {"from": "2026-02-02T00:00:00", "to": "2026-02-07T00:00:00", **params}
+    return app.test_client().get("/api/availability/search", query_string=params, base_url="https://localhost")
+
+
+def test_search_merges_fragments_and_snaps_to_the_grid():
+    with app.app_context():
+        db.session.add_all([
+            # Fragments book_supervision left behind: 09:10-10:00 and 10:00-10:40 make one stretch.
+            _slot(910, 1000),
+            _slot(1000, 1040),
+            _slot(1100, 1130),
+            _slot(1400, 1700, location="B"),
+            _slot(1500, 1600, available=False, location="B"),
+        ])
+        db.session.commit()
+
+    body = _search(duration="30m").get_json()
+
+    assert [(w["start"][11:16], w["end"][11:16], w["location"]) for w in body["windows"]] == [
+        ("09:15", "09:45", "A"),
+        ("09:45", "10:15", "A"),
+        ("11:00", "11:30", "A"),
+        ("14:00", "14:30", "B"),
+        ("14:30", "15:00", "B"),
+        ("16:00", "16:30", "B"),
+        ("16:30", "17:00", "B"),
+    ]
+    assert len(body["windows"][1]["slot_ids"]) == 2
+
+
+def test_search_filters_by_location_and_limits_results():
+    with app.app_context():
+        db.session.add_all([
+            _slot(900, 1200, location="A"),
+            _slot(900, 1200, location="B", day=3),
+            _slot(1000, 1100, available=False, location="A", day=3),
+        ])
+        db.session.commit()
+
+    body = _search(duration="1h", location="B", limit="2").get_json()
+
+    assert [(w["start"], w["location"]) for w in body["windows"]] == [
+        ("2026-02-03T09:00:00", "B"),
+        ("2026-02-03T11:00:00", "B"),
+    ]
+
+
+def test_search_rejects_bad_parameters():
+    assert _search().status_code == 400
+    assert _search(duration="soon").status_code == 400
+    assert _search(duration="1h", limit="0").status_code == 400
+    assert _search(duration="99999999999h").status_code == 400
+    assert _search(duration="1h", grid="99999999999h").status_code == 400
+    assert _search(duration="1h", **{"from": "9999-12-31", "to": ""}).status_code == 400
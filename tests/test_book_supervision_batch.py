@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from app import app, db, SlotChange, TimeSlot
+
+
+def _seed():
+    with app.app_context():
+        db.session.add_all([
+            TimeSlot(start_time=datetime(2026, 2, 2, 9), end_time=datetime(2026, 2, 2, 12),
+                     is_available=True, location="A"),
+            TimeSlot(start_time=datetime(2026, 2, 2, 14), end_time=datetime(2026, 2, 2, 15),
+                     is_available=False, name="existing", location="A"),
+        ])
+        db.session.commit()
+
+
+def _booking(start, end, name, **extra):
+    return {"start_time": f"2026-02-02T{start}:00", "end_time": f"2026-02-02T{end}:00", "name": name, **extra}
+
+
+@pytest.fixture
+def post_batch(admin_headers):
+    def post(bookings, **extra):
+        return app.test_client().post(
+            "/api/admin/book_supervision/batch",
+            json={"bookings": bookings, **extra},
+            headers=admin_headers,
+            base_url="https://localhost",
+        )
+    return post
+
+
+def _rows():
+    with app.app_context():
+        return [
+            (slot.start_time.strftime("%H:%M"), slot.end_time.strftime("%H:%M"), slot.is_available, slot.name)
+            for slot in TimeSlot.query.order_by(TimeSlot.start_time)
+        ]
+
+
+def test_batch_applies_bookings_in_order_and_commits_once(post_batch):
+    _seed()
+
+    response = post_batch([
+        _booking("09:00", "10:00", "x"),
+        _booking("10:30", "11:00", "y"),
+        # Swallows the right-hand fragment the previous booking split off.
+        _booking("11:00", "12:30", "z", location="A"),
+    ])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"] is True
+    assert [result["action"] for result in body["results"]] == ["created", "created", "created"]
+    assert _rows() == [
+        ("09:00", "10:00", False, "x"),
+        ("10:00", "10:30", True, None),
+        ("10:30", "11:00", False, "y"),
+        ("11:00", "12:30", False, "z"),
+        ("14:00", "15:00", False, "existing"),
+    ]
+    with app.app_context():
+        assert db.session.query(SlotChange.revision).distinct().count() == 1
+
+
+def test_all_or_nothing_batch_reports_conflicts_and_saves_nothing(post_batch):
+    _seed()
+
+    response = post_batch([_booking("09:00", "10:00", "x"), _booking("14:30", "15:30", "y", location="A")])
+
+    assert response.status_code == 409
+    body = response.get_json()
+    assert body["success"] is False
+    assert [c["name"] for c in body["conflicts"]] == ["existing"]
+    assert [result["index"] for result in body["results"]] == [1]
+    assert _rows() == [("09:00", "12:00", True, None), ("14:00", "15:00", False, "existing")]
+
+
+def test_per_item_batch_saves_the_bookings_that_fit(post_batch):
+    _seed()
+
+    response = post_batch(
+        [_booking("09:00", "10:00", "x"), _booking("09:30", "10:30", "y"), {"start_time": "2026-02-02T11:00:00"}],
+        mode="per_item",
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"] is False
+    first, clash, invalid = body["results"]
+    assert first["success"] is True
+    assert clash["status"] == 409
+    assert clash["conflicts"] == [{key: first[key] for key in ("id", "start_time", "end_time", "name", "location")}]
+    assert invalid["status"] == 400
+    assert _rows()[0] == ("09:00", "10:00", False, "x")
@@ -1,33 +1,8 @@
-import os
-import sys
 from datetime import datetime
-from pathlib import Path
-
-os.environ.setdefault("SECRET_KEY", "test-secret")
-os.environ.setdefault("ADMIN_PASSWORD", "test-admin-password")
-os.environ.setdefault("ADMIN_API_TOKEN", "test-admin-token")
-os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/scheduler-test.sqlite")
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 import pytest
 
-from app import app, db, TimeSlot
-
-
-@pytest.fixture(autouse=True)
-def clean_database(monkeypatch):
-    monkeypatch.setattr("app.send_confirmation_email", lambda *args, **kwargs: True)
-    app.config["TESTING"] = True
-    with app.app_context():
-        db.drop_all()
-        db.create_all()
-        yield
-        db.session.remove()
-        db.drop_all()
-
-
-def _admin_headers():
-    return {"Authorization": "Bearer test-admin-token"}
+from app import app, db, Admin, TimeSlot
 
 
 def test_repeating_signup_rejects_future_booked_conflict(monkeypatch):
@@ -68,7 +43,7 @@ def test_repeating_signup_rejects_future_booked_conflict(monkeypatch):
         ]
 
 
-def test_admin_save_does_not_delete_rows_omitted_from_stale_calendar_snapshot():
+def test_admin_save_does_not_delete_rows_omitted_from_stale_calendar_snapshot(admin_headers):
     with app.app_context():
         db.session.add_all(
             [
@@ -101,7 +76,7 @@ def test_admin_save_does_not_delete_rows_omitted_from_stale_calendar_snapshot():
                 "name": None,
             }
         ],
-        headers=_admin_headers(),
+        headers=admin_headers,
         base_url="https://localhost",
     )
 
@@ -112,3 +87,372 @@ def test_admin_save_does_not_delete_rows_omitted_from_stale_calendar_snapshot():
             (1, None, "A"),
             (2, "late booking", "B"),
         ]
+
+
+def test_repeating_signup_books_every_week_and_ignores_gaps_between_occurrences(monkeypatch):
+    monkeypatch.setenv("END_OF_TERM", "2026-02-23")
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                # Inside the series span but between weekly occurrences.
+                TimeSlot(
+                    start_time=datetime(2026, 2, 9, 15),
+                    end_time=datetime(2026, 2, 9, 16),
+                    is_available=False,
+                    name="existing",
+                    location="A",
+                ),
+            ]
+        )
+        db.session.commit()
+
+    response = app.test_client().post(
+        "/api/signup",
+        json={"id": 1, "name": "new", "repeat": True},
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 200
+    with app.app_context():
+        slots = (
+            TimeSlot.query.filter_by(name="new").order_by(TimeSlot.start_time).all()
+        )
+        assert [(s.start_time, s.is_repeated) for s in slots] == [
+            (datetime(2026, 2, 2, 14), True),
+            (datetime(2026, 2, 9, 14), True),
+            (datetime(2026, 2, 16, 14), True),
+            (datetime(2026, 2, 23, 14), True),
+        ]
+
+
+def test_series_delete_only_removes_later_occurrences_of_that_series(monkeypatch, admin_headers):
+    monkeypatch.setenv("END_OF_TERM", "2026-02-16")
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                # Same name and weekly pattern, but not part of the new series.
+                TimeSlot(
+                    start_time=datetime(2026, 2, 23, 14),
+                    end_time=datetime(2026, 2, 23, 15),
+                    is_available=False,
+                    name="new",
+                    location="A",
+                    is_repeated=True,
+                    series_id="other-series",
+                ),
+            ]
+        )
+        db.session.commit()
+
+    client = app.test_client()
+    signup = client.post(
+        "/api/signup",
+        json={"id": 1, "name": "new", "repeat": True},
+        base_url="https://localhost",
+    )
+    assert signup.status_code == 200
+
+    with app.app_context():
+        second = TimeSlot.query.filter_by(start_time=datetime(2026, 2, 9, 14)).one()
+        second_id = second.id
+
+    relocate = client.post(
+        f"/api/admin/change_location/{second_id}",
+        json={"location": "B", "update_subsequent": True},
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+    assert relocate.json["success"] is True
+
+    with app.app_context():
+        slots = TimeSlot.query.order_by(TimeSlot.start_time).all()
+        assert [(s.start_time.day, s.location) for s in slots] == [
+            (2, "A"),
+            (9, "B"),
+            (16, "B"),
+            (23, "A"),
+        ]
+
+    delete = client.delete(
+        f"/api/admin/delete_timeslot/{second_id}?delete_subsequent=true",
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+    assert delete.json["success"] is True
+
+    with app.app_context():
+        remaining = TimeSlot.query.order_by(TimeSlot.start_time).all()
+        assert [s.start_time.day for s in remaining] == [2, 23]
+
+
+def test_series_changes_skip_occurrences_that_were_freed_or_rebooked(admin_headers):
+    with app.app_context():
+        occurrences = [
+            # (day, available, name): the 16th was freed, the 23rd rebooked for someone else.
+            (2, False, "new"),
+            (9, False, "new"),
+            (16, True, None),
+            (23, False, "other"),
+        ]
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, day, 14),
+                    end_time=datetime(2026, 2, day, 15),
+                    is_available=available,
+                    name=name,
+                    location="A",
+                    is_repeated=True,
+                    series_id="series",
+                )
+                for day, available, name in occurrences
+            ]
+        )
+        db.session.commit()
+        second_id = TimeSlot.query.filter_by(start_time=datetime(2026, 2, 9, 14)).one().id
+
+    client = app.test_client()
+    relocate = client.post(
+        f"/api/admin/change_location/{second_id}",
+        json={"location": "B", "update_subsequent": True},
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+    assert relocate.json["success"] is True
+    with app.app_context():
+        slots = TimeSlot.query.order_by(TimeSlot.start_time).all()
+        assert [(s.start_time.day, s.location) for s in slots] == [(2, "A"), (9, "B"), (16, "A"), (23, "A")]
+
+    delete = client.delete(
+        f"/api/admin/delete_timeslot/{second_id}?delete_subsequent=true",
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+    assert delete.json["success"] is True
+    with app.app_context():
+        remaining = TimeSlot.query.order_by(TimeSlot.start_time).all()
+        assert [(s.start_time.day, s.name) for s in remaining] == [(2, "new"), (16, None), (23, "other")]
+
+
+def test_admin_change_set_creates_updates_and_deletes_only_referenced_slots(admin_headers):
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 3, 14),
+                    end_time=datetime(2026, 2, 3, 15),
+                    is_available=True,
+                    location="B",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 4, 14),
+                    end_time=datetime(2026, 2, 4, 15),
+                    is_available=False,
+                    name="untouched",
+                    location="C",
+                ),
+            ]
+        )
+        db.session.commit()
+
+    response = app.test_client().post(
+        "/api/admin/set_timeslots",
+        json={
+            "created": [
+                {
+                    "id": "temp_1",
+                    "start_time": "2026-02-05T10:00:00",
+                    "end_time": "2026-02-05T11:00:00",
+                    "is_available": True,
+                    "location": "D",
+                },
+                {
+                    "id": "temp_2",
+                    "start_time": "2026-02-05T11:00:00",
+                    "end_time": "2026-02-05T12:00:00",
+                    "is_available": True,
+                    "location": "D",
+                },
+            ],
+            "updated": [
+                {
+                    "id": "1",
+                    "start_time": "2026-02-02T15:00:00",
+                    "end_time": "2026-02-02T16:00:00",
+                    "is_available": True,
+                    "location": "A2",
+                },
+                {
+                    "id": "99",
+                    "start_time": "2026-02-02T15:00:00",
+                    "end_time": "2026-02-02T16:00:00",
+                    "is_available": True,
+                    "location": "gone",
+                },
+            ],
+            "deleted": [2],
+        },
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 200
+    assert response.json["id_map"] == {"temp_1": 4, "temp_2": 5}
+    assert (response.json["created"], response.json["updated"], response.json["deleted"]) == (2, 1, 1)
+    with app.app_context():
+        slots = TimeSlot.query.order_by(TimeSlot.id).all()
+        assert [(s.id, s.start_time.hour, s.location, s.name) for s in slots] == [
+            (1, 15, "A2", None),
+            (3, 14, "C", "untouched"),
+            (4, 10, "D", None),
+            (5, 11, "D", None),
+        ]
+
+
+def test_signup_rejects_slot_overlapping_a_booked_slot():
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14, 30),
+                    end_time=datetime(2026, 2, 2, 15, 30),
+                    is_available=False,
+                    name="existing",
+                    location="B",
+                ),
+            ]
+        )
+        db.session.commit()
+
+    response = app.test_client().post(
+        "/api/signup",
+        json={"id": 1, "name": "new", "repeat": False},
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 409
+    assert [c["id"] for c in response.json["conflicts"]] == [2]
+    with app.app_context():
+        assert db.session.get(TimeSlot, 1).is_available is True
+
+
+def test_database_rejects_overlapping_booked_rows():
+    from sqlalchemy.exc import IntegrityError
+
+    with app.app_context():
+        db.session.add(
+            TimeSlot(
+                start_time=datetime(2026, 2, 2, 14),
+                end_time=datetime(2026, 2, 2, 15),
+                is_available=False,
+                name="first",
+                location="A",
+            )
+        )
+        db.session.commit()
+
+        # Adjacent is fine.
+        db.session.add(
+            TimeSlot(
+                start_time=datetime(2026, 2, 2, 15),
+                end_time=datetime(2026, 2, 2, 16),
+                is_available=False,
+                name="adjacent",
+                location="A",
+            )
+        )
+        db.session.commit()
+
+        db.session.add(
+            TimeSlot(
+                start_time=datetime(2026, 2, 2, 14, 30),
+                end_time=datetime(2026, 2, 2, 15, 30),
+                is_available=False,
+                name="overlap",
+                location="A",
+            )
+        )
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+
+def test_admin_save_maps_booked_overlap_to_409(admin_headers):
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=False,
+                    name="first",
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 16),
+                    end_time=datetime(2026, 2, 2, 17),
+                    is_available=False,
+                    name="second",
+                    location="A",
+                ),
+            ]
+        )
+        db.session.commit()
+
+    response = app.test_client().post(
+        "/api/admin/set_timeslots",
+        json={
+            "updated": [
+                {
+                    "id": 2,
+                    "start_time": "2026-02-02T14:30:00",
+                    "end_time": "2026-02-02T15:30:00",
+                    "is_available": False,
+                    "name": "second",
+                    "location": "A",
+                }
+            ]
+        },
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 409
+    assert response.json["success"] is False
+    assert [c["id"] for c in response.json["conflicts"]] == [1]
+
+
+def test_init_db_command_creates_schema_and_admin():
+    with app.app_context():
+        db.drop_all()
+
+    result = app.test_cli_runner().invoke(args=["init-db"])
+
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert Admin.query.count() == 1
+        assert db.session.execute(db.text("SELECT revision FROM data_revision")).scalar() == 0
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import app, db, TimeSlot, ensure_admin_account
+
+
+@pytest.fixture(autouse=True)
+def clear_ical_cache():
+    app_module._ical_cache.clear()
+
+
+def _calendar_id():
+    with app.app_context():
+        return ensure_admin_account().calendar_id
+
+
+def _add_available_slot(calendar_id, days_ahead=7):
+    start = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
+    with app.app_context():
+        db.session.add(
+            TimeSlot(
+                start_time=start,
+                end_time=start + timedelta(hours=1),
+                is_available=True,
+                location="A",
+                calendar_id=calendar_id,
+            )
+        )
+        db.session.commit()
+
+
+def _add_booked_slots(calendar_id, days_ago):
+    with app.app_context():
+        for index, days in enumerate(days_ago):
+            start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=days)
+            db.session.add(
+                TimeSlot(
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                    is_available=False,
+                    name=f"student {index}",
+                    location="A",
+                    calendar_id=calendar_id,
+                )
+            )
+        db.session.commit()
+
+
+def test_export_returns_304_when_etag_matches():
+    calendar_id = _calendar_id()
+    client = app.test_client()
+
+    first = client.get(f"/api/export/{calendar_id}", base_url="https://localhost")
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+
+    second = client.get(
+        f"/api/export/{calendar_id}",
+        headers={"If-None-Match": first.headers["ETag"]},
+        base_url="https://localhost",
+    )
+    assert second.status_code == 304
+    assert second.data == b""
+
+
+def test_export_ignores_if_modified_since():
+    calendar_id = _calendar_id()
+    _add_available_slot(calendar_id)
+    _add_available_slot(calendar_id, days_ahead=8)
+    client = app.test_client()
+    client.post("/api/signup", json={"id": 1, "name": "first", "repeat": False}, base_url="https://localhost")
+
+    first = client.get(f"/api/export/{calendar_id}", base_url="https://localhost")
+    assert b"SUMMARY:first" in first.data
+    # A second booking, most likely within the same second as Last-Modified.
+    client.post("/api/signup", json={"id": 2, "name": "second", "repeat": False}, base_url="https://localhost")
+
+    second = client.get(
+        f"/api/export/{calendar_id}",
+        headers={"If-Modified-Since": first.headers["Last-Modified"]},
+        base_url="https://localhost",
+    )
+    assert second.status_code == 200
+    assert b"SUMMARY:second" in second.data
+
+
+def test_export_is_rebuilt_after_a_write():
+    calendar_id = _calendar_id()
+    _add_available_slot(calendar_id)
+    client = app.test_client()
+
+    first = client.get(f"/api/export/{calendar_id}", base_url="https://localhost")
+    assert b"BEGIN:VEVENT" not in first.data
+
+    signup = client.post(
+        "/api/signup",
+        json={"id": 1, "name": "student", "repeat": False},
+        base_url="https://localhost",
+    )
+    assert signup.status_code == 200
+
+    second = client.get(
+        f"/api/export/{calendar_id}",
+        headers={"If-None-Match": first.headers["ETag"]},
+        base_url="https://localhost",
+    )
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert b"SUMMARY:student" in second.data
+
+
+def test_export_unknown_calendar_is_404():
+    response = app.test_client().get("/api/export/not-a-calendar", base_url="https://localhost")
+    assert response.status_code == 404
+
+
+def test_export_defaults_to_a_past_horizon():
+    calendar_id = _calendar_id()
+    _add_booked_slots(calendar_id, days_ago=[400, 30, -3])
+    client = app.test_client()
+
+    default = client.get(f"/api/export/{calendar_id}", base_url="https://localhost").data
+    assert default.count(b"BEGIN:VEVENT") == 2
+    assert b"SUMMARY:student 0" not in default
+
+    recent = client.get(f"/api/export/{calendar_id}?past=2w&future=1w", base_url="https://localhost").data
+    assert recent.count(b"BEGIN:VEVENT") == 1
+    assert b"SUMMARY:student 2" in recent
+
+    everything = client.get(f"/api/export/{calendar_id}?past=all", base_url="https://localhost")
+    assert everything.data.count(b"BEGIN:VEVENT") == 3
+    assert everything.data.endswith(b"END:VCALENDAR\r\n")
+
+    invalid = client.get(f"/api/export/{calendar_id}?past=forever", base_url="https://localhost")
+    assert invalid.status_code == 400
+
+
+def test_large_feeds_stream_without_being_cached(monkeypatch):
+    monkeypatch.setattr(app_module, "_ICAL_CHUNK_BYTES", 200)
+    monkeypatch.setenv("ICAL_CACHE_MAX_BYTES", "500")
+    calendar_id = _calendar_id()
+    _add_booked_slots(calendar_id, days_ago=range(1, 11))
+    with app.app_context():
+        app_module._ensure_data_revision_row()
+
+    response = app.test_client().get(f"/api/export/{calendar_id}", base_url="https://localhost")
+
+    assert response.is_streamed
+    assert response.data.count(b"BEGIN:VEVENT") == 10
+    assert app_module._ical_cache == {}
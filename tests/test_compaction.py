@@ -0,0 +1,159 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, update
+
+from app import app, db, CompactionConflict, SlotChange, TimeSlot, compact_available_slots
+
+
+def _slot(start, end, location="A", available=True, day=2, piece_of=None):
+    """A slot; piece_of is the slot book_supervision would have cut it from."""
+    if piece_of is not None:
+        db.session.flush()
+    hour, minute = divmod(start, 100)
+    end_hour, end_minute = divmod(end, 100)
+    slot = TimeSlot(
+        start_time=datetime(2026, 2, day, hour, minute),
+        end_time=datetime(2026, 2, day, end_hour, end_minute),
+        is_available=available,
+        name=None if available else "booked",
+        location=location,
+        split_from=piece_of.id if piece_of is not None else None,
+    )
+    db.session.add(slot)
+    return slot
+
+
+def _rows():
+    return [
+        (slot.start_time.strftime("%H:%M"), slot.end_time.strftime("%H:%M"), slot.location, slot.is_available)
+        for slot in TimeSlot.query.order_by(TimeSlot.start_time, TimeSlot.location)
+    ]
+
+
+def test_compaction_merges_touching_fragments_at_one_location():
+    with app.app_context():
+        first = _slot(900, 1000)
+        _slot(1000, 1100, piece_of=first)
+        _slot(1030, 1200, piece_of=first)
+        _slot(1200, 1300, location="B")
+        _slot(1300, 1400)
+        booked = _slot(1400, 1500, available=False)
+        db.session.commit()
+        first_id, booked_id = first.id, booked.id
+
+        counts = compact_available_slots()
+
+        assert counts == {"rows_removed": 2, "slots_extended": 1}
+        assert _rows() == [
+            ("09:00", "12:00", "A", True),
+            ("12:00", "13:00", "B", True),
+            ("13:00", "14:00", "A", True),
+            ("14:00", "15:00", "A", False),
+        ]
+        assert db.session.get(TimeSlot, first_id).end_time == datetime(2026, 2, 2, 12)
+        assert db.session.get(TimeSlot, booked_id) is not None
+        assert {(change.op, change.kind) for change in SlotChange.query} == {("upsert", "moved"), ("delete", "deleted")}
+
+
+def test_compaction_aborts_when_a_candidate_is_booked_meanwhile():
+    with app.app_context():
+        first = _slot(900, 1000)
+        fragment = _slot(1000, 1100, piece_of=first)
+        db.session.commit()
+        fragment_id = fragment.id
+
+        def book_before_first_write(state):
+            if (state.is_update or state.is_delete) and not booked:
+                booked.append(fragment_id)
+                with db.engine.begin() as connection:  # a signup committing concurrently
+                    connection.execute(
+                        update(TimeSlot).where(TimeSlot.id == fragment_id).values(is_available=False, name="student")
+                    )
+
+        booked = []
+        event.listen(db.session, "do_orm_execute", book_before_first_write)
+        try:
+            with pytest.raises(CompactionConflict):
+                compact_available_slots()
+        finally:
+            event.remove(db.session, "do_orm_execute", book_before_first_write)
+
+        assert _rows() == [("09:00", "10:00", "A", True), ("10:00", "11:00", "A", False)]
+        assert SlotChange.query.count() == 0
+
+
+def test_compact_slots_command_supports_dry_run():
+    with app.app_context():
+        first = _slot(900, 1000)
+        _slot(1000, 1100, piece_of=first)
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["compact-slots", "--dry-run"])
+
+    assert "Would remove 1 rows" in result.output
+    with app.app_context():
+        assert TimeSlot.query.count() == 2
+
+
+def test_deleting_a_slot_compacts_that_day(admin_headers):
+    with app.app_context():
+        first = _slot(900, 1000)
+        _slot(1000, 1100, piece_of=first)
+        third = _slot(900, 1000, day=3)
+        _slot(1000, 1100, day=3, piece_of=third)
+        booked = _slot(1400, 1500, available=False)
+        db.session.commit()
+        booked_id = booked.id
+
+    response = app.test_client().delete(
+        f"/api/admin/delete_timeslot/{booked_id}", headers=admin_headers, base_url="https://localhost"
+    )
+
+    assert response.get_json()["success"] is True
+    with app.app_context():
+        assert TimeSlot.query.count() == 3
+        assert TimeSlot.query.filter_by(end_time=datetime(2026, 2, 2, 11)).one().start_time == datetime(2026, 2, 2, 9)
+
+
+def test_slots_created_back_to_back_are_never_merged(admin_headers):
+    with app.app_context():
+        _slot(1000, 1100)
+        _slot(1100, 1200)
+        _slot(1200, 1300)
+        other = _slot(1000, 1100, location="B")
+        db.session.commit()
+        other_id = other.id
+
+    response = app.test_client().delete(
+        f"/api/admin/delete_timeslot/{other_id}", headers=admin_headers, base_url="https://localhost"
+    )
+
+    assert response.get_json()["success"] is True
+    with app.app_context():
+        assert _rows() == [("10:00", "11:00", "A", True), ("11:00", "12:00", "A", True), ("12:00", "13:00", "A", True)]
+
+
+def test_pieces_of_a_split_slot_merge_back_once_freed(admin_headers):
+    with app.app_context():
+        slot = _slot(1000, 1300)
+        _slot(1300, 1400)
+        db.session.commit()
+        slot_id = slot.id
+
+    response = app.test_client().post(
+        "/api/admin/book_supervision",
+        json={"start_time": "2026-02-02T11:00:00", "end_time": "2026-02-02T12:00:00", "students": ["a"]},
+        headers=admin_headers,
+        base_url="https://localhost",
+    )
+    assert response.get_json()["success"] is True
+
+    with app.app_context():
+        booked = TimeSlot.query.filter_by(is_available=False).one()
+        booked.is_available, booked.name = True, None
+        db.session.commit()
+
+        assert compact_available_slots() == {"rows_removed": 2, "slots_extended": 1}
+        assert _rows() == [("10:00", "13:00", "A", True), ("13:00", "14:00", "A", True)]
+        assert TimeSlot.query.order_by(TimeSlot.start_time).first().id == slot_id
@@ -0,0 +1,128 @@
+import smtplib
+from datetime import datetime
+
+import pytest
+
+from app import app, db, TimeSlot, EmailOutbox, deliver_outbox_batch, _utcnow
+
+
+@pytest.fixture(autouse=True)
+def no_confirmation_emails():
+    """These tests need the real send_confirmation_email."""
+
+
+class FakeSMTP:
+    """Local SMTP stand-in recording connections and messages."""
+
+    connections = 0
+
+    def __init__(self, fail_with=None):
+        FakeSMTP.connections += 1
+        self.fail_with = fail_with
+        self.sent = []
+
+    def send_message(self, msg):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append(msg)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _signup(slot_id):
+    return app.test_client().post(
+        "/api/signup",
+        json={"id": slot_id, "name": f"student {slot_id}", "repeat": False},
+        base_url="https://localhost",
+    )
+
+
+def _add_available_slots(count):
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2 + day, 14),
+                    end_time=datetime(2026, 2, 2 + day, 15),
+                    is_available=True,
+                    location="A",
+                )
+                for day in range(count)
+            ]
+        )
+        db.session.commit()
+
+
+def test_signup_queues_confirmation_in_booking_transaction():
+    _add_available_slots(1)
+
+    assert _signup(1).status_code == 200
+    assert _signup(1).status_code == 409
+
+    with app.app_context():
+        messages = EmailOutbox.query.all()
+        assert [(m.status, m.subject) for m in messages] == [
+            ("pending", "New supervision signup: student 1")
+        ]
+
+
+def test_deliver_outbox_batch_reuses_one_connection():
+    _add_available_slots(3)
+    for slot_id in (1, 2, 3):
+        assert _signup(slot_id).status_code == 200
+
+    servers = []
+
+    def factory():
+        servers.append(FakeSMTP())
+        return servers[-1]
+
+    with app.app_context():
+        counts = deliver_outbox_batch(smtp_factory=factory)
+        assert counts == {"claimed": 3, "sent": 3, "retried": 0, "dead": 0}
+        assert len(servers) == 1
+        assert [m["Subject"] for m in servers[0].sent] == [
+            "New supervision signup: student 1",
+            "New supervision signup: student 2",
+            "New supervision signup: student 3",
+        ]
+        assert {m.status for m in EmailOutbox.query.all()} == {"sent"}
+
+
+def test_failed_delivery_backs_off_then_dead_letters(monkeypatch):
+    monkeypatch.setenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "2")
+    _add_available_slots(1)
+    assert _signup(1).status_code == 200
+
+    def factory():
+        return FakeSMTP(fail_with=smtplib.SMTPRecipientsRefused({}))
+
+    with app.app_context():
+        assert deliver_outbox_batch(smtp_factory=factory)["retried"] == 1
+        message = EmailOutbox.query.one()
+        assert message.status == "pending"
+        assert message.next_attempt_at > _utcnow()
+
+        # Not due yet, so nothing is claimed.
+        assert deliver_outbox_batch(smtp_factory=factory)["claimed"] == 0
+
+        message.next_attempt_at = datetime(2000, 1, 1)
+        db.session.commit()
+        assert deliver_outbox_batch(smtp_factory=factory)["dead"] == 1
+        message = EmailOutbox.query.one()
+        assert (message.status, message.attempts) == ("dead", 2)
+
+
+def test_unexpected_send_error_is_rescheduled():
+    _add_available_slots(1)
+    assert _signup(1).status_code == 200
+
+    with app.app_context():
+        counts = deliver_outbox_batch(smtp_factory=lambda: FakeSMTP(fail_with=ValueError("bad header")))
+        assert counts["retried"] == 1
+        message = EmailOutbox.query.one()
+        assert (message.status, message.attempts, message.last_error) == ("pending", 1, "bad header")
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import text
+
+from app import app, db, _engine_profile
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout():
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+    response = app.test_client().get("/api/health", base_url="https://localhost")
+    assert response.get_json()["database"]["journal_mode"] == "WAL"
+
+
+def test_postgres_profile_sets_pool_and_statement_timeout(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "8")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "2500")
+
+    options, profile = _engine_profile("postgresql://scheduler@db/scheduler")
+
+    assert options["pool_size"] == 8
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=2500"}
+    assert profile == {
+        "dialect": "postgresql",
+        "pool_size": 8,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 2500,
+    }
+
+
+def test_invalid_sqlite_journal_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "wal; DROP TABLE time_slot")
+    with pytest.raises(RuntimeError):
+        _engine_profile("sqlite:///timeslots.db")
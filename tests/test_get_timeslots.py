@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from app import app, db, TimeSlot
+
+
+def _add_slots():
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 9, 14),
+                    end_time=datetime(2026, 2, 9, 15),
+                    is_available=False,
+                    name="booked",
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 15, 23, 30),
+                    end_time=datetime(2026, 2, 16, 0, 30),
+                    is_available=True,
+                    location="B",
+                ),
+            ]
+        )
+        db.session.commit()
+
+
+def test_get_timeslots_without_window_returns_everything():
+    _add_slots()
+
+    response = app.test_client().get("/api/get_timeslots", base_url="https://localhost")
+
+    assert response.status_code == 200
+    assert [slot["id"] for slot in response.json] == [1, 2, 3]
+
+
+def test_get_timeslots_returns_only_slots_overlapping_window():
+    _add_slots()
+
+    response = app.test_client().get(
+        "/api/get_timeslots",
+        query_string={"start": "2026-02-09T00:00:00Z", "end": "2026-02-16T00:00:00Z"},
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 200
+    assert [slot["id"] for slot in response.json] == [2, 3]
+
+
+def test_get_timeslots_rejects_invalid_window():
+    response = app.test_client().get(
+        "/api/get_timeslots",
+        query_string={"start": "2026-02-16", "end": "2026-02-09"},
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 400
+    assert response.json["success"] is False
+
+
+def test_get_timeslots_serves_gzip_and_304_until_a_write():
+    import gzip
+    import json
+
+    _add_slots()
+    client = app.test_client()
+    # Any write creates the revision row the cache is keyed on.
+    client.post(
+        "/api/admin/change_location/1",
+        json={"location": "A"},
+        headers={"Authorization": "Bearer test-admin-token"},
+        base_url="https://localhost",
+    )
+
+    first = client.get(
+        "/api/get_timeslots",
+        headers={"Accept-Encoding": "gzip"},
+        base_url="https://localhost",
+    )
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert [slot["id"] for slot in json.loads(gzip.decompress(first.data))] == [1, 2, 3]
+
+    cached = client.get(
+        "/api/get_timeslots",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+        base_url="https://localhost",
+    )
+    assert cached.status_code == 304
+
+    client.post(
+        "/api/signup",
+        json={"id": 1, "name": "student", "repeat": False},
+        base_url="https://localhost",
+    )
+
+    refreshed = client.get(
+        "/api/get_timeslots",
+        headers={"If-None-Match": first.headers["ETag"]},
+        base_url="https://localhost",
+    )
+    assert refreshed.status_code == 200
+    assert "Content-Encoding" not in refreshed.headers
+    assert refreshed.json[0]["name"] == "student"
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import app, db, Admin, IdempotencyKey, TimeSlot, _utcnow, ensure_admin_account
+
+
+def _available_slot():
+    with app.app_context():
+        slot = TimeSlot(
+            start_time=datetime(2026, 2, 2, 14), end_time=datetime(2026, 2, 2, 15), is_available=True, location="A"
+        )
+        db.session.add(slot)
+        db.session.commit()
+        return slot.id
+
+
+def _signup(slot_id, key, name="student"):
+    return app.test_client().post(
+        "/api/signup",
+        json={"id": slot_id, "name": name, "repeat": False},
+        headers={"Idempotency-Key": key},
+        base_url="https://localhost",
+    )
+
+
+def test_resent_signup_replays_the_original_response(monkeypatch):
+    sent = []
+    monkeypatch.setattr("app.send_confirmation_email", lambda **kwargs: sent.append(kwargs))
+    slot_id = _available_slot()
+
+    first = _signup(slot_id, "key-1")
+    again = _signup(slot_id, "key-1")
+
+    assert first.status_code == again.status_code == 200
+    assert again.get_json() == first.get_json()
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert len(sent) == 1
+    assert _signup(slot_id, "key-1", name="someone else").status_code == 422
+    assert _signup(slot_id, "key-2").status_code == 409
+
+
+def test_book_supervision_retry_does_not_run_twice(admin_headers):
+    payload = {"start_time": "2026-02-02T14:00:00", "end_time": "2026-02-02T15:00:00", "students": ["a"], "location": "A"}
+    client = app.test_client()
+
+    responses = [
+        client.post("/api/admin/book_supervision", json=payload,
+                    headers={**admin_headers, "Idempotency-Key": "book-1"}, base_url="https://localhost")
+        for _ in range(2)
+    ]
+
+    assert [r.get_json()["action"] for r in responses] == ["created", "created"]
+    with app.app_context():
+        assert TimeSlot.query.count() == 1
+
+
+def test_keys_are_scoped_to_the_supervisors_calendar():
+    with app.app_context():
+        calendar_ids = [ensure_admin_account().calendar_id]
+        other = Admin(username="second", password="second-password")
+        db.session.add(other)
+        db.session.commit()
+        calendar_ids.append(other.calendar_id)
+    payload = {"start_time": "2026-02-02T14:00:00", "end_time": "2026-02-02T15:00:00", "students": ["a"], "location": "A"}
+
+    for calendar_id in calendar_ids:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["admin_logged_in"] = True
+            session["admin_calendar_id"] = calendar_id
+        response = client.post("/api/admin/book_supervision", json=payload,
+                               headers={"Idempotency-Key": "book-1"}, base_url="https://localhost")
+        assert "Idempotent-Replayed" not in response.headers
+
+    with app.app_context():
+        assert sorted(slot.calendar_id for slot in TimeSlot.query) == sorted(calendar_ids)
+
+
+def test_concurrent_duplicate_joins_the_in_flight_request():
+    slot_id = _available_slot()
+    body = b'{"id": %d, "name": "student", "repeat": false}' % slot_id
+    request_hash = hashlib.sha256(b"/api/signup?\n" + body).hexdigest()
+    with app.app_context():
+        now = _utcnow()
+        db.session.add(IdempotencyKey(
+            endpoint="signup", key="key-1", request_hash=request_hash, status="pending",
+            created_at=now, expires_at=now + timedelta(hours=1),
+        ))
+        db.session.commit()
+
+    def finish_first_request():
+        time.sleep(0.2)
+        with app.app_context():
+            row = IdempotencyKey.query.one()
+            row.status, row.response_status, row.response_body = "done", 200, '{"success": true}'
+            db.session.commit()
+
+    writes = []
+
+    def count_writes(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(("INSERT INTO idempotency_key", "DELETE FROM idempotency_key")):
+            writes.append(statement)
+
+    finisher = threading.Thread(target=finish_first_request)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", count_writes)
+    finisher.start()
+    try:
+        response = app.test_client().post(
+            "/api/signup", data=body, content_type="application/json",
+            headers={"Idempotency-Key": "key-1"}, base_url="https://localhost",
+        )
+    finally:
+        finisher.join()
+        with app.app_context():
+            event.remove(db.engine, "before_cursor_execute", count_writes)
+
+    assert response.get_json() == {"success": True}
+    assert len(writes) == 2  # one prune and one claim, then read-only polling
+    with app.app_context():
+        assert db.session.get(TimeSlot, slot_id).is_available is True
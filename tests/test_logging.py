@@ -0,0 +1,54 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from app import app, _DeferredQueueHandler, _JsonFormatter, _RequestLogFilter, _parse_log_sample_rates
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """No database here, and no app context: each request context needs its own g."""
+
+
+def _record(level, message, *args):
+    return logging.LogRecord("app", level, __file__, 10, message, args, None)
+
+
+def test_json_formatter_includes_request_fields():
+    log_filter = _RequestLogFilter({})
+    record = _record(logging.INFO, "Fetching timeslots (start=%s, end=%s)", "a", "b")
+    with app.test_request_context("/api/get_timeslots"):
+        assert log_filter.filter(record)
+
+    entry = json.loads(_JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "Fetching timeslots (start=a, end=b)"
+    assert entry["endpoint"] == "get_timeslots"
+    assert entry["method"] == "GET"
+    assert entry["path"] == "/api/get_timeslots"
+
+
+def test_sampled_endpoints_drop_info_but_keep_warnings():
+    log_filter = _RequestLogFilter(_parse_log_sample_rates("get_timeslots=0, export_calendar=1"))
+
+    with app.test_request_context("/api/get_timeslots"):
+        assert not log_filter.filter(_record(logging.INFO, "Fetching timeslots"))
+        assert log_filter.filter(_record(logging.WARNING, "Something odd"))
+    with app.test_request_context("/api/export/abc"):
+        assert log_filter.filter(_record(logging.INFO, "Exporting calendar"))
+    with app.test_request_context("/api/signup", method="POST"):
+        assert log_filter.filter(_record(logging.INFO, "Signup attempt received"))
+    assert log_filter.filter(_record(logging.INFO, "Outside a request"))
+
+
+def test_queued_records_are_formatted_by_the_listener():
+    log_queue = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+
+    handler.handle(_record(logging.INFO, "Deleted slots %s", [1, 2]))
+
+    queued = log_queue.get_nowait()
+    assert (queued.msg, queued.args) == ("Deleted slots %s", ([1, 2],))
+    assert json.loads(_JsonFormatter().format(queued))["message"] == "Deleted slots [1, 2]"
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import app, db, TimeSlot
+
+
+def test_metrics_requires_admin():
+    response = app.test_client().get("/api/metrics", base_url="https://localhost")
+    assert response.status_code == 401
+
+
+def test_metrics_reports_route_latency_status_and_sql_counts(admin_headers):
+    with app.app_context():
+        db.session.add(
+            TimeSlot(
+                start_time=datetime(2026, 2, 2, 14),
+                end_time=datetime(2026, 2, 2, 15),
+                is_available=True,
+                location="A",
+            )
+        )
+        db.session.commit()
+    client = app.test_client()
+    client.post(
+        "/api/signup",
+        json={"id": 1, "name": "student", "repeat": False},
+        base_url="https://localhost",
+    )
+
+    response = client.get("/api/metrics", headers=admin_headers, base_url="https://localhost")
+
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert "# TYPE scheduler_request_duration_seconds histogram" in body
+    assert 'scheduler_request_duration_seconds_bucket{endpoint="signup",method="POST",le="+Inf"}' in body
+    assert 'scheduler_requests_total{endpoint="signup",method="POST",status="200"}' in body
+    assert 'scheduler_sql_statements_total{endpoint="signup"}' in body
+    assert 'scheduler_db_pool_checkout_wait_seconds_count{endpoint="signup"}' in body
+
+
+def test_metrics_merges_worker_snapshots(tmp_path, monkeypatch, admin_headers):
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    (tmp_path / "999999.json").write_text(
+        '{"counters": [["scheduler_requests_total", '
+        '[["endpoint", "other_worker"], ["method", "GET"], ["status", "304"]], 7]], '
+        '"histograms": []}'
+    )
+
+    response = app.test_client().get(
+        "/api/metrics", headers=admin_headers, base_url="https://localhost"
+    )
+
+    assert (
+        'scheduler_requests_total{endpoint="other_worker",method="GET",status="304"} 7'
+        in response.get_data(as_text=True)
+    )
+
+
+def test_failed_statements_do_not_leak_timers():
+    with app.app_context():
+        with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            assert conn.info["query_started"] == []
@@ -0,0 +1,71 @@
+import gzip
+import shutil
+
+import pytest
+from flask import url_for
+
+import app as app_module
+from app import app, ensure_admin_account
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    app_module._page_cache.clear()
+
+
+def test_fingerprinted_static_urls_are_immutable():
+    with app.test_request_context():
+        url = url_for("static", filename="mirex.png")
+    assert "?v=" in url
+    client = app.test_client()
+
+    fingerprinted = client.get(url, base_url="https://localhost")
+    assert fingerprinted.status_code == 200
+    assert "immutable" in fingerprinted.headers["Cache-Control"]
+    stale = client.get("/static/mirex.png?v=old", base_url="https://localhost")
+    assert stale.headers["Cache-Control"] == "no-cache"
+
+
+def test_pages_are_rendered_once_and_served_gzipped(monkeypatch):
+    renders = []
+    original = app_module.render_template
+    monkeypatch.setattr(app_module, "render_template", lambda *a, **kw: renders.append(a[0]) or original(*a, **kw))
+    client = app.test_client()
+
+    plain = client.get("/faq", base_url="https://localhost")
+    compressed = client.get("/faq", headers={"Accept-Encoding": "gzip"}, base_url="https://localhost")
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    revalidated = client.get(
+        "/faq", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]},
+        base_url="https://localhost",
+    )
+    assert revalidated.status_code == 304
+    assert renders == ["faq.html"]
+
+
+def test_signup_page_is_cached_per_start_date(monkeypatch):
+    with app.app_context():
+        ensure_admin_account()
+    client = app.test_client()
+
+    monkeypatch.setenv("SUPERVISION_START_DATE", "2026-01-19")
+    assert b"2026-01-19" in client.get("/", base_url="https://localhost").data
+    monkeypatch.setenv("SUPERVISION_START_DATE", "2026-04-27")
+    assert b"2026-04-27" in client.get("/", base_url="https://localhost").data
+
+
+def test_built_image_variants_are_linked_when_present(monkeypatch, tmp_path):
+    static = tmp_path / "static"
+    shutil.copytree(app.static_folder, static)
+    monkeypatch.setattr(app, "static_folder", str(static))
+    client = app.test_client()
+
+    page = client.get("/questions-set", base_url="https://localhost").data
+    assert b"/static/erlenmeyer-flask.png?v=" in page
+
+    (static / "variants").mkdir()
+    (static / "variants" / "erlenmeyer-flask-64.png").write_bytes(b"small")
+    app_module._page_cache.clear()
+    page = client.get("/questions-set", base_url="https://localhost").data
+    assert b"/static/variants/erlenmeyer-flask-64.png?v=" in page
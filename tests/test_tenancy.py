@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import app as app_module
+from app import app, db, Admin, TimeSlot, ensure_admin_account
+
+
+@pytest.fixture(autouse=True)
+def clear_ical_cache():
+    app_module._ical_cache.clear()
+
+
+def _two_calendars():
+    """Default calendar with one booked slot; second calendar with a booked and an available slot."""
+    with app.app_context():
+        default = ensure_admin_account()
+        other = Admin(username="second", password="second-password", display_name="Ada", email="ada@example.com")
+        db.session.add(other)
+        db.session.commit()
+        db.session.add_all([
+            TimeSlot(start_time=datetime(2026, 2, 2, 14), end_time=datetime(2026, 2, 2, 15),
+                     is_available=False, name="default student", location="A", calendar_id=default.calendar_id),
+            TimeSlot(start_time=datetime(2026, 2, 2, 14), end_time=datetime(2026, 2, 2, 15),
+                     is_available=False, name="ada student", location="B", calendar_id=other.calendar_id),
+            TimeSlot(start_time=datetime(2026, 2, 3, 10), end_time=datetime(2026, 2, 3, 11),
+                     is_available=True, location="B", calendar_id=other.calendar_id),
+        ])
+        db.session.commit()
+        return default.calendar_id, other.calendar_id
+
+
+def test_get_timeslots_and_export_only_read_one_calendar():
+    default_id, other_id = _two_calendars()
+    client = app.test_client()
+
+    default_slots = client.get("/api/get_timeslots", base_url="https://localhost").get_json()
+    assert [slot["name"] for slot in default_slots] == ["default student"]
+    other_slots = client.get(f"/api/get_timeslots?calendar={other_id}", base_url="https://localhost").get_json()
+    assert [slot["name"] for slot in other_slots] == ["ada student", None]
+    missing = client.get("/api/get_timeslots?calendar=nope", base_url="https://localhost")
+    assert missing.status_code == 404
+
+    feed = client.get(f"/api/export/{other_id}?past=all", base_url="https://localhost").data
+    assert b"SUMMARY:ada student" in feed
+    assert b"default student" not in feed
+    assert b"X-WR-CALNAME:Ada Supervision Calendar" in feed
+
+    page = client.get(f"/c/{other_id}", base_url="https://localhost")
+    assert page.status_code == 200
+    assert b"Ada's supervision signups" in page.data
+
+
+def test_booked_slots_may_overlap_across_calendars_but_not_within_one():
+    default_id, other_id = _two_calendars()
+    with app.app_context():
+        db.session.add(TimeSlot(start_time=datetime(2026, 2, 2, 14, 30), end_time=datetime(2026, 2, 2, 15, 30),
+                                is_available=False, name="clash", location="B", calendar_id=other_id))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+
+
+def test_admin_writes_stay_in_their_calendar():
+    default_id, other_id = _two_calendars()
+    client = app.test_client()
+    login = client.post(
+        "/admin/login", data={"username": "second", "password": "second-password"}, base_url="https://localhost"
+    )
+    assert login.status_code == 302
+
+    with app.app_context():
+        default_slot_id = TimeSlot.query.filter_by(calendar_id=default_id).one().id
+    denied = client.delete(f"/api/admin/delete_timeslot/{default_slot_id}", base_url="https://localhost")
+    assert denied.get_json()["success"] is False
+
+    booked = client.post(
+        "/api/admin/book_supervision",
+        json={"start_time": "2026-02-03T10:00:00", "end_time": "2026-02-03T11:00:00", "students": ["grace"]},
+        base_url="https://localhost",
+    )
+    assert booked.status_code == 200
+    created = client.post(
+        "/api/admin/set_timeslots",
+        json={"created": [{"id": "temp_1", "start_time": "2026-02-04T09:00:00", "end_time": "2026-02-04T10:00:00",
+                           "location": "B", "is_available": True}]},
+        base_url="https://localhost",
+    ).get_json()
+
+    with app.app_context():
+        assert db.session.get(TimeSlot, default_slot_id) is not None
+        assert db.session.get(TimeSlot, booked.get_json()["id"]).calendar_id == other_id
+        assert db.session.get(TimeSlot, created["id_map"]["temp_1"]).calendar_id == other_id
+
+
+def test_signup_confirmation_goes_to_the_calendar_owner(monkeypatch):
+    default_id, other_id = _two_calendars()
+    sent = []
+    monkeypatch.setattr("app.send_confirmation_email", lambda **kwargs: sent.append(kwargs))
+    with app.app_context():
+        slot_id = TimeSlot.query.filter_by(calendar_id=other_id, is_available=True).one().id
+
+    response = app.test_client().post(
+        "/api/signup", json={"id": slot_id, "name": "student", "repeat": False}, base_url="https://localhost"
+    )
+
+    assert response.status_code == 200
+    assert sent[0]["recipient"] == "ada@example.com"
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from app import app, db, TimeSlot, SlotChange
+
+
+def _add_slots():
+    with app.app_context():
+        db.session.add_all(
+            [
+                TimeSlot(
+                    start_time=datetime(2026, 2, 2, 14),
+                    end_time=datetime(2026, 2, 2, 15),
+                    is_available=True,
+                    location="A",
+                ),
+                TimeSlot(
+                    start_time=datetime(2026, 2, 3, 14),
+                    end_time=datetime(2026, 2, 3, 15),
+                    is_available=True,
+                    location="B",
+                ),
+            ]
+        )
+        db.session.commit()
+
+
+def test_changes_returns_upserts_and_tombstones_since_revision(admin_headers):
+    _add_slots()
+    client = app.test_client()
+
+    listing = client.get("/api/get_timeslots", base_url="https://localhost")
+    since = int(listing.headers["X-Data-Revision"])
+
+    signup = client.post(
+        "/api/signup",
+        json={"id": 1, "name": "student", "repeat": False},
+        base_url="https://localhost",
+    )
+    assert signup.status_code == 200
+    delete = client.delete(
+        "/api/admin/delete_timeslot/2", headers=admin_headers, base_url="https://localhost"
+    )
+    assert delete.json["success"] is True
+
+    response = client.get(
+        "/api/timeslots/changes", query_string={"since": since}, base_url="https://localhost"
+    )
+
+    assert response.status_code == 200
+    assert response.json["revision"] == since + 2
+    changes = response.json["changes"]
+    assert changes[0]["op"] == "upsert"
+    assert changes[0]["slot"]["id"] == 1
+    assert changes[0]["slot"]["name"] == "student"
+    assert changes[0]["kind"] == "booked"
+    assert changes[1] == {"op": "delete", "kind": "deleted", "id": 2}
+
+    up_to_date = client.get(
+        "/api/timeslots/changes",
+        query_string={"since": response.json["revision"]},
+        base_url="https://localhost",
+    )
+    assert up_to_date.json["changes"] == []
+
+
+def test_changes_requires_resync_when_log_was_pruned(admin_headers):
+    _add_slots()
+    client = app.test_client()
+    for slot_id in (1, 2):
+        client.post(
+            "/api/admin/change_location/%d" % slot_id,
+            json={"location": "C"},
+            headers=admin_headers,
+            base_url="https://localhost",
+        )
+    with app.app_context():
+        db.session.execute(db.delete(SlotChange).where(SlotChange.revision == 1))
+        db.session.commit()
+
+    response = client.get(
+        "/api/timeslots/changes", query_string={"since": 0}, base_url="https://localhost"
+    )
+
+    assert response.status_code == 410
+    assert response.json["resync_required"] is True
+    assert response.json["revision"] == 2
+
+
+def test_stream_sends_pending_changes_as_server_sent_events():
+    _add_slots()
+    client = app.test_client()
+    since = int(client.get("/api/get_timeslots", base_url="https://localhost").headers["X-Data-Revision"])
+    client.post(
+        "/api/signup",
+        json={"id": 1, "name": "student", "repeat": False},
+        base_url="https://localhost",
+    )
+
+    # With no held-stream capacity the worker answers with what is pending
+    # and closes, leaving EventSource to reconnect.
+    response = client.get(
+        "/api/timeslots/stream",
+        headers={"Last-Event-ID": str(since)},
+        base_url="https://localhost",
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("retry: ")
+    assert f"id: {since + 1}\nevent: changes\n" in body
+    assert '"kind": "booked"' in body
+
+
+def test_stream_asks_stale_clients_to_resync():
+    response = app.test_client().get(
+        "/api/timeslots/stream", query_string={"since": 5}, base_url="https://localhost"
+    )
+
+    assert "event: resync" in response.get_data(as_text=True)